@@ -0,0 +1,170 @@
+# bench_city_index.py
+"""Latency and recall benchmark for CityIndex's fuzzy fallback.
+
+Builds an index over a gazetteer, then looks up misspelled names with the
+trigram fallback behind ``suggest()`` and reports p50/p95/p99/max latency
+and recall: the share of lookups whose intended place is among the first
+``--limit`` results. Each query is a random place's name with one typo
+(substitution, insertion, deletion or transposition of adjacent letters).
+
+By default the gazetteer is synthetic: ``--cities`` names made of common
+syllables, which share trigrams far more than real names do, so it is a
+hard case. ``--city-list`` uses a real ``city.list.json(.gz)`` instead
+(the compiled index is written next to it, as the app does).
+``--exact`` also ranks that many queries by exact trigram similarity
+against every name, the recall ceiling for this kind of matching.
+
+Names, typos and queries are reproducible for a given --seed. Results are
+printed as JSON. With ``--max-p95-ms`` or ``--min-recall`` the script
+exits with status 1 when a result misses the bound.
+
+Usage:
+    python bench_city_index.py [--cities 220000] [--queries 500]
+        [--seed 0] [--city-list city.list.json.gz] [--exact 50]
+        [--max-p95-ms 2] [--min-recall 0.9]
+"""
+
+import argparse
+import gc
+import gzip
+import heapq
+import json
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+from typing import List, Tuple
+
+from city_index import CityIndex, normalize_name, trigrams
+
+SYLLABLES = [
+    "an", "ba", "ber", "burg", "ck", "don", "dr", "el", "en", "field",
+    "ford", "gar", "go", "ham", "holm", "hu", "ia", "id", "is", "ka", "ky",
+    "la", "li", "lin", "ma", "me", "mouth", "na", "ne", "nu", "o", "ov",
+    "par", "po", "port", "ri", "ro", "sa", "sk", "st", "sto", "ten", "to",
+    "ton", "va", "vi", "ville", "ya",
+]
+
+
+def synthetic_city_list(path: str, count: int, rng: random.Random):
+    """Write ``count`` distinct made-up places as a city.list.json.gz."""
+    names = set()
+    while len(names) < count:
+        syllables = rng.randint(2, 5)
+        names.add("".join(rng.choice(SYLLABLES) for _ in range(syllables)).title())
+    cities = [
+        {"id": i, "name": name, "country": "XX", "coord": {"lat": 0, "lon": 0}}
+        for i, name in enumerate(sorted(names))
+    ]
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        json.dump(cities, f)
+
+
+def misspell(name: str, rng: random.Random) -> str:
+    """The name with one random typo."""
+    name = normalize_name(name)
+    i = rng.randrange(len(name))
+    kind = rng.choice(("substitution", "insertion", "deletion", "transposition"))
+    letter = rng.choice(string.ascii_lowercase)
+    if kind == "substitution":
+        return name[:i] + letter + name[i + 1:]
+    if kind == "insertion":
+        return name[:i] + letter + name[i:]
+    if kind == "deletion" and len(name) > 3:
+        return name[:i] + name[i + 1:]
+    if i < len(name) - 1:
+        return name[:i] + name[i + 1] + name[i] + name[i + 2:]
+    return name + letter
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def exact_recall(index: CityIndex, queries: List[Tuple[str, str]], limit: int) -> float:
+    """Recall when every name is ranked by trigram similarity (slow)."""
+    names = [trigrams(key) for key in index._keys]
+    hits = 0
+    for name, query in queries:
+        grams = trigrams(query)
+        best = heapq.nlargest(
+            limit,
+            range(len(names)),
+            key=lambda p: len(grams & names[p]) / len(grams | names[p]),
+        )
+        hits += any(index._entries[p].name == name for p in best)
+    return hits / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cities", type=int, default=220000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--city-list", help="real gazetteer to index")
+    parser.add_argument("--exact", type=int, default=0,
+                        help="queries to also rank exhaustively")
+    parser.add_argument("--max-p95-ms", type=float)
+    parser.add_argument("--min-recall", type=float)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        path = args.city_list
+        if path is None:
+            path = os.path.join(directory, "city.list.json.gz")
+            synthetic_city_list(path, args.cities, rng)
+        index = CityIndex(path)
+        started = time.perf_counter()
+        index.load()
+        load_seconds = time.perf_counter() - started
+
+    places = [entry.name for entry in index._entries]
+    queries = []
+    while len(queries) < args.queries:
+        name = rng.choice(places)
+        if len(normalize_name(name)) >= 3:
+            queries.append((name, misspell(name, rng)))
+
+    latencies, hits = [], 0
+    gc.collect()
+    for name, query in queries:
+        started = time.perf_counter()
+        results = index._fuzzy(query, args.limit)
+        latencies.append((time.perf_counter() - started) * 1000)
+        hits += any(entry.name == name for entry in results[:args.limit])
+
+    report = {
+        "settings": {
+            "cities": len(places),
+            "city_list": args.city_list or "synthetic",
+            "queries": len(queries),
+            "limit": args.limit,
+            "seed": args.seed,
+        },
+        "load_seconds": load_seconds,
+        "p50_ms": percentile(latencies, 0.50),
+        "p95_ms": percentile(latencies, 0.95),
+        "p99_ms": percentile(latencies, 0.99),
+        "max_ms": max(latencies),
+        "recall": hits / len(queries),
+    }
+    if args.exact:
+        report["exact_recall"] = exact_recall(
+            index, queries[:args.exact], args.limit
+        )
+        report["exact_queries"] = min(args.exact, len(queries))
+    print(json.dumps(report, indent=2))
+
+    failed = (
+        args.max_p95_ms is not None and report["p95_ms"] > args.max_p95_ms
+    ) or (args.min_recall is not None and report["recall"] < args.min_recall)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
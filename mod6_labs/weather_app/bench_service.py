@@ -0,0 +1,474 @@
+# bench_service.py
+"""Benchmark and load-test harness for WeatherService.
+
+Runs WeatherService against a local stand-in for the OpenWeatherMap API (a
+small asyncio HTTP/1.1 server with keep-alive), so no API key or network is
+needed. The stub's latency, error rate and payload size are configurable.
+
+Workloads (each on a fresh service, so caches and pools start cold):
+  single    sequential lookups of distinct cities
+  burst     concurrent lookups of distinct cities
+  repeated  concurrent lookups cycling over a few popular cities
+  variants  sequential lookups of popular cities in varied spellings
+  sections  current + forecast + air quality, fanned out vs one by one
+  memory    bytes held per city as raw JSON dicts vs WeatherSnapshots
+
+For the lookup workloads the report gives p50/p95/p99 latency, requests
+per second, upstream requests and TCP connections seen by the stub,
+errors, retries and cache counters (plus per-phase p50s with --metrics).
+The report is JSON (stdout or --output), and --compare prints p50/p95
+deltas against an earlier report. The stub's cities, latencies and
+errors are reproducible for a given --seed, so runs are comparable.
+
+Usage:
+    python bench_service.py [--requests 200] [--latency-ms 20]
+        [--error-rate 0.0] [--payload-bytes 600] [--seed 0]
+        [--output run.json] [--compare previous.json]
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+import zlib
+from dataclasses import asdict
+from typing import Callable, Dict, List
+from urllib.parse import parse_qs, urlsplit
+
+
+class StubWeatherServer:
+    """Minimal OpenWeatherMap stand-in that counts connections and requests."""
+
+    def __init__(
+        self,
+        latency: float,
+        error_rate: float,
+        payload_bytes: int,
+        seed: int = 0,
+    ):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.payload_bytes = payload_bytes
+        self.seed = seed
+        self.random = random.Random(seed)
+        self.connections = 0
+        self.requests = 0
+        self.names: Dict[int, str] = {}  # city ID -> name, for ?id= lookups
+        self._server = None
+
+    async def start(self) -> str:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}/data/2.5/weather"
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    def reset(self):
+        """Zero the counters and restart the latency/error sequence."""
+        self.connections = 0
+        self.requests = 0
+        self.random.seed(self.seed)
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                target = head.split(b" ", 2)[1].decode()
+                self.requests += 1
+                status, body = await self._respond(target)
+                writer.write(
+                    f"HTTP/1.1 {status}\r\n"
+                    "Content-Type: application/json\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    "Connection: keep-alive\r\n\r\n".encode()
+                    + body
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, target: str):
+        if self.latency:
+            await asyncio.sleep(self.random.uniform(0.5, 1.5) * self.latency)
+        if self.random.random() < self.error_rate:
+            return "500 Internal Server Error", b'{"cod":500}'
+
+        url = urlsplit(target)
+        params = parse_qs(url.query)
+        if "id" in params:
+            name = self.names.get(int(params["id"][0]), "Stub City")
+        else:
+            name = params.get("q", ["Stub City"])[0]
+        if url.path.endswith("/forecast"):
+            payload = self.forecast_payload(name)
+        elif url.path.endswith("/air_pollution"):
+            payload = self.air_payload()
+        else:
+            payload = self.payload(name)
+            self.names[payload["id"]] = payload["name"]
+        body = json.dumps(payload).encode()
+        if self.payload_bytes > len(body):
+            payload["padding"] = "x" * (self.payload_bytes - len(body) - 14)
+            body = json.dumps(payload).encode()
+        return "200 OK", body
+
+    @staticmethod
+    def forecast_payload(name: str) -> dict:
+        """A 5-day / 3-hour forecast response (40 entries)."""
+        return {
+            "cod": "200",
+            "cnt": 40,
+            "list": [
+                {
+                    "dt": 1760000000 + i * 10800,
+                    "main": {
+                        "temp": 10 + i % 8,
+                        "feels_like": 9,
+                        "humidity": 80,
+                    },
+                    "weather": [
+                        {
+                            "id": 803,
+                            "main": "Clouds",
+                            "description": "broken clouds",
+                            "icon": "04d",
+                        }
+                    ],
+                    "wind": {"speed": 3.2, "deg": 240},
+                    "dt_txt": "2025-10-09 12:00:00",
+                }
+                for i in range(40)
+            ],
+            "city": {"name": name, "country": "GB", "timezone": 3600},
+        }
+
+    @staticmethod
+    def air_payload() -> dict:
+        """An air pollution response."""
+        return {
+            "coord": {"lon": -0.1257, "lat": 51.5085},
+            "list": [
+                {
+                    "main": {"aqi": 2},
+                    "components": {
+                        "co": 201.9,
+                        "no2": 18.2,
+                        "o3": 68.7,
+                        "pm2_5": 6.1,
+                        "pm10": 9.4,
+                    },
+                    "dt": 1760000000,
+                }
+            ],
+        }
+
+    @staticmethod
+    def payload(name: str) -> dict:
+        """A current-weather response shaped like the real API's."""
+        # Spellings of a name ("paris", "Paris, FR") are one city, as upstream
+        name = name.partition(",")[0].strip().title()
+        # Spread cities over the globe so coordinate caches see distinct
+        # cells (crc32, unlike hash(), is the same in every process)
+        seed = zlib.crc32(name.encode())
+        return {
+            "coord": {
+                "lon": round((seed // 1700) % 3600 / 10 - 180, 4),
+                "lat": round(seed % 1700 / 10 - 85, 4),
+            },
+            "weather": [
+                {"id": 500, "main": "Rain", "description": "light rain", "icon": "10d"}
+            ],
+            "base": "stations",
+            "main": {
+                "temp": 12.3,
+                "feels_like": 11.1,
+                "temp_min": 10.9,
+                "temp_max": 13.4,
+                "pressure": 1012,
+                "humidity": 81,
+                "sea_level": 1012,
+                "grnd_level": 1008,
+            },
+            "visibility": 10000,
+            "wind": {"speed": 4.1, "deg": 230, "gust": 7.2},
+            "rain": {"1h": 0.31},
+            "clouds": {"all": 75},
+            "dt": 1760000000,
+            "sys": {
+                "type": 2,
+                "id": 2075535,
+                "country": "GB",
+                "sunrise": 1759990000,
+                "sunset": 1760030000,
+            },
+            "timezone": 3600,
+            "id": seed % 10_000_000,
+            "name": name,
+            "cod": 200,
+        }
+
+
+def measure_memory(build: Callable[[], list]) -> float:
+    """Bytes still allocated per item after ``build()``, via tracemalloc."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    items = build()
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return retained / len(items)
+
+
+def run_memory(args) -> Dict:
+    """Footprint per city of raw response dicts vs WeatherSnapshots."""
+    from models import WeatherSnapshot
+
+    bodies = [
+        json.dumps(StubWeatherServer.payload(f"City {i}"))
+        for i in range(args.memory_cities)
+    ]
+    now = time.time()
+    raw = measure_memory(lambda: [json.loads(body) for body in bodies])
+    snapshot = measure_memory(
+        lambda: [
+            WeatherSnapshot.from_payload(json.loads(body), now)
+            for body in bodies
+        ]
+    )
+    return {
+        "cities": len(bodies),
+        "raw_bytes_per_city": raw,
+        "snapshot_bytes_per_city": snapshot,
+        "reduction": raw / snapshot,
+    }
+
+
+async def run_sections(server: StubWeatherServer, args) -> Dict:
+    """Time get_weather_sections against the same calls made in sequence."""
+    from weather_service import WeatherService
+
+    cities = [f"City {i}" for i in range(min(args.requests, 50))]
+    first, complete, sequential = [], [], []
+
+    service = WeatherService()
+    for city in cities:
+        started = time.perf_counter()
+        async for section, _ in service.get_weather_sections(city):
+            if section == "current":
+                first.append((time.perf_counter() - started) * 1000)
+        complete.append((time.perf_counter() - started) * 1000)
+    await service.aclose()
+
+    service = WeatherService()
+    for city in cities:
+        started = time.perf_counter()
+        snapshot = await service.get_weather(city)
+        await service.get_forecast(city)
+        await service.get_air_quality(snapshot.lat, snapshot.lon)
+        sequential.append((time.perf_counter() - started) * 1000)
+    await service.aclose()
+
+    return {
+        "cities": len(cities),
+        "current_p50_ms": percentile(first, 0.50),
+        "all_sections_p50_ms": percentile(complete, 0.50),
+        "sequential_p50_ms": percentile(sequential, 0.50),
+    }
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of a list of samples."""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def timed_lookup(service, city: str, latencies: List[float], errors: list):
+    from weather_service import WeatherServiceError
+
+    started = time.perf_counter()
+    try:
+        await service.get_weather(city)
+    except WeatherServiceError as e:
+        errors.append(str(e))
+    latencies.append((time.perf_counter() - started) * 1000)
+
+
+async def run_workload(name: str, server: StubWeatherServer, args) -> Dict:
+    from weather_service import WeatherService
+
+    service = WeatherService()
+    server.reset()
+    latencies: List[float] = []
+    errors: List[str] = []
+
+    started = time.perf_counter()
+    if name == "single":
+        for i in range(args.requests):
+            await timed_lookup(service, f"City {i}", latencies, errors)
+    elif name == "variants":
+        # How people type the same place: case, spacing, country codes
+        spellings = ("Popular {}", "popular {}", " POPULAR {} ",
+                     "Popular {}, GB", "popular {},gb")
+        for i in range(args.requests):
+            spelling = spellings[i % len(spellings)]
+            city = spelling.format(i // len(spellings) % args.popular)
+            await timed_lookup(service, city, latencies, errors)
+    else:
+        if name == "burst":
+            cities = [f"City {i}" for i in range(args.requests)]
+        else:
+            cities = [f"Popular {i % args.popular}" for i in range(args.requests)]
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def bounded(city):
+            async with semaphore:
+                await timed_lookup(service, city, latencies, errors)
+
+        await asyncio.gather(*(bounded(city) for city in cities))
+    elapsed = time.perf_counter() - started
+    await service.aclose()
+
+    result = {
+        "requests": len(latencies),
+        "p50_ms": percentile(latencies, 0.50),
+        "p95_ms": percentile(latencies, 0.95),
+        "p99_ms": percentile(latencies, 0.99),
+        "mean_ms": statistics.fmean(latencies),
+        "requests_per_second": len(latencies) / elapsed,
+        "upstream_requests": server.requests,
+        "connections_opened": server.connections,
+        "errors": len(errors),
+        "retries": service.retries,
+        "cache": asdict(service.cache_stats),
+        "resolved_names": len(service.resolver),
+    }
+    if service.metrics is not None:
+        result["phases_p50_ms"] = {
+            phase: service.metrics.histogram(
+                "http_phase_seconds", phase=phase
+            ).quantile(0.5) * 1000
+            for phase in ("connect", "send", "wait", "body")
+            if service.metrics.histogram("http_phase_seconds", phase=phase)
+        }
+    return result
+
+
+async def run(args) -> Dict:
+    server = StubWeatherServer(
+        latency=args.latency_ms / 1000,
+        error_rate=args.error_rate,
+        payload_bytes=args.payload_bytes,
+        seed=args.seed,
+    )
+    base_url = await server.start()
+
+    # Point the service at the stub before Config reads the environment
+    os.environ["OPENWEATHER_API_KEY"] = "benchmark"
+    os.environ["OPENWEATHER_BASE_URL"] = base_url
+    from config import Config
+
+    Config.load()
+    Config.DISK_CACHE_PATH = ""  # measure the network path, not SQLite
+    Config.HISTORY_DIR = ""
+    Config.ICON_PREFETCH = False  # stay offline; icons are not the API
+    Config.METRICS_ENABLED = args.metrics
+    Config.RATE_LIMIT_PER_MINUTE = args.rate_limit_per_minute
+    Config.RATE_LIMIT_BURST = args.concurrency
+
+    report = {
+        "settings": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "popular_cities": args.popular,
+            "latency_ms": args.latency_ms,
+            "error_rate": args.error_rate,
+            "payload_bytes": args.payload_bytes,
+            "seed": args.seed,
+            "metrics": args.metrics,
+        },
+        "workloads": {},
+    }
+    try:
+        for name in args.workloads:
+            if name == "memory":
+                report["workloads"][name] = run_memory(args)
+            elif name == "sections":
+                report["workloads"][name] = await run_sections(server, args)
+            else:
+                report["workloads"][name] = await run_workload(
+                    name, server, args
+                )
+    finally:
+        await server.stop()
+    return report
+
+
+def compare(report: Dict, previous: Dict):
+    """Print p50/p95 changes against an earlier report to stderr."""
+    for name, current in report["workloads"].items():
+        before = previous.get("workloads", {}).get(name)
+        if before is None or "p50_ms" not in before:
+            continue
+        for metric in ("p50_ms", "p95_ms"):
+            change = (current[metric] - before[metric]) / before[metric] * 100
+            print(
+                f"{name:>8} {metric}: {before[metric]:8.2f} -> "
+                f"{current[metric]:8.2f} ms ({change:+.1f}%)",
+                file=sys.stderr,
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--popular", type=int, default=5,
+                        help="distinct cities in the repeated workload")
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--payload-bytes", type=int, default=600)
+    parser.add_argument("--seed", type=int, default=0,
+                        help="seed for the stub's latencies and errors")
+    parser.add_argument("--rate-limit-per-minute", type=float, default=1e9,
+                        help="client-side limiter (default: effectively off)")
+    parser.add_argument("--metrics", action="store_true",
+                        help="enable request instrumentation")
+    parser.add_argument("--memory-cities", type=int, default=5000,
+                        help="snapshots held in the memory workload")
+    parser.add_argument("--workloads", nargs="+",
+                        default=["single", "burst", "repeated", "variants",
+                                 "sections", "memory"],
+                        choices=["single", "burst", "repeated", "variants",
+                                 "sections", "memory"])
+    parser.add_argument("--output", help="write the JSON report to a file")
+    parser.add_argument("--compare", help="earlier JSON report to diff against")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+# bench_startup.py
+"""Startup benchmark for the Weather App.
+
+Measures, in fresh interpreters:
+  * import time of ``main`` (``python -X importtime``) and which heavy
+    modules it pulls in eagerly;
+  * time from interpreter start to the first ``page.update`` batch sent by
+    ``WeatherApp`` (the first frame), using a recording connection instead
+    of a Flet client.
+
+Results are printed as JSON. With ``--max-first-update-ms`` the script exits
+with status 1 when the median exceeds the budget, so it can guard against
+regressions.
+
+Usage:
+    python bench_startup.py [--runs 5] [--max-first-update-ms 800]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Modules that must not be imported before the first frame
+DEFERRED_MODULES = ["weather_service", "dotenv"]
+
+FIRST_UPDATE_SNIPPET = """
+import time
+started = time.perf_counter()
+import json, sys
+import flet as ft
+from flet.core.connection import Connection
+from flet.core.protocol import PageCommandsBatchResponsePayload
+
+first_update = []
+
+
+class RecordingConnection(Connection):
+    next_id = 0
+
+    def send_commands(self, session_id, commands):
+        if not first_update:
+            first_update.append(time.perf_counter())
+        results = []
+        for command in commands:
+            if command.name == "add":
+                ids = []
+                for _ in command.commands:
+                    RecordingConnection.next_id += 1
+                    ids.append(f"_{RecordingConnection.next_id}")
+                results.append(" ".join(ids))
+        return PageCommandsBatchResponsePayload(results=results, error="")
+
+    def send_command(self, session_id, command):
+        return self.send_commands(session_id, [command])
+
+
+import main
+imported = time.perf_counter()
+
+page = ft.Page(RecordingConnection(), "bench", None)
+page.run_task = lambda *args, **kwargs: None  # background work not timed
+main.WeatherApp(page)
+
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "first_update_ms": (first_update[0] - started) * 1000,
+    "deferred_imported": [m for m in %r if m in sys.modules],
+}))
+""" % (DEFERRED_MODULES,)
+
+
+def run_first_update() -> dict:
+    """Time one cold start up to the first page.update."""
+    output = subprocess.run(
+        [sys.executable, "-c", FIRST_UPDATE_SNIPPET],
+        cwd=HERE,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run_importtime() -> dict:
+    """Parse ``-X importtime`` output for ``import main``."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=HERE,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+
+    slowest = sorted(modules.items(), key=lambda item: item[1][0], reverse=True)
+    return {
+        "main_cumulative_ms": modules.get("main", (0, 0))[1] / 1000,
+        "slowest_self_ms": {
+            name: times[0] / 1000 for name, times in slowest[:10]
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--max-first-update-ms",
+        type=float,
+        default=None,
+        help="fail if the median time to first page.update exceeds this",
+    )
+    args = parser.parse_args()
+
+    runs = [run_first_update() for _ in range(args.runs)]
+    first_update = [run["first_update_ms"] for run in runs]
+    report = {
+        "runs": args.runs,
+        "import_main_ms": statistics.median(run["import_ms"] for run in runs),
+        "first_update_ms": {
+            "median": statistics.median(first_update),
+            "min": min(first_update),
+            "max": max(first_update),
+        },
+        "deferred_modules_imported_early": sorted(
+            {name for run in runs for name in run["deferred_imported"]}
+        ),
+        "importtime": run_importtime(),
+    }
+    print(json.dumps(report, indent=2))
+
+    failed = bool(report["deferred_modules_imported_early"])
+    if args.max_first_update_ms is not None:
+        failed |= report["first_update_ms"]["median"] > args.max_first_update_ms
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# cache.py
+"""In-process TTL + LRU cache for weather responses."""
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Hashable, Optional, Tuple
+
+
+@dataclass
+class CacheStats:
+    """Counters used to tune the cache size and TTL."""
+
+    hits: int = 0
+    stale_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+
+class TTLCache:
+    """
+    Least-recently-used cache whose entries expire after a TTL.
+
+    Entries older than ``ttl`` are stale. Stale entries are kept for another
+    ``stale_ttl`` seconds so the caller can serve them while it refreshes in
+    the background (stale-while-revalidate). After that they are dropped.
+    """
+
+    def __init__(self, ttl: float, max_entries: int, stale_ttl: float = 0):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.stats = CacheStats()
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Tuple[Optional[Any], bool]:
+        """
+        Look up a cached value.
+
+        Args:
+            key: Normalized cache key
+
+        Returns:
+            Tuple of (value, is_fresh). The value is None on a miss.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return None, False
+
+        stored_at, value = entry
+        age = time.monotonic() - stored_at
+        if age < self.ttl:
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return value, True
+        if age < self.ttl + self.stale_ttl:
+            self._entries.move_to_end(key)
+            self.stats.stale_hits += 1
+            return value, False
+
+        # Too old to serve at all
+        del self._entries[key]
+        self.stats.misses += 1
+        return None, False
+
+    def set(self, key: Hashable, value: Any):
+        """Store a value, evicting the least recently used entry if full."""
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def clear(self):
+        """Remove every entry (counters are kept)."""
+        self._entries.clear()
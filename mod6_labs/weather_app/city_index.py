@@ -0,0 +1,259 @@
+# city_index.py
+"""Offline city-name index for autocomplete and name-to-ID resolution."""
+
+import bisect
+import gzip
+import json
+import os
+import threading
+import unicodedata
+from array import array
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional
+
+
+class CityEntry(NamedTuple):
+    """A place from the gazetteer, identified by its OpenWeatherMap city ID."""
+
+    id: int
+    name: str
+    country: str
+    lat: float
+    lon: float
+
+    @property
+    def label(self) -> str:
+        return f"{self.name}, {self.country}" if self.country else self.name
+
+
+def normalize_name(text: str) -> str:
+    """Case-fold, strip accents and collapse whitespace in a place name."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.casefold().split())
+
+
+def trigrams(text: str) -> set:
+    """Padded character trigrams of a normalized name."""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class CityIndex:
+    """
+    Sorted-array index of place names with a trigram fuzzy fallback.
+
+    Names are kept in one sorted list, so prefix queries are a binary search
+    followed by a short scan. Misspelled input falls back to a trigram
+    index whose postings are ordered by name length, so a query only
+    counts names about as long as itself. A name one typo away shares all
+    but a few of the query's trigrams, so it is in one of the query's
+    rarest postings: those are always counted, a few more (within a
+    budget) sharpen the counts, and the best few are ranked by similarity.
+
+    The source is OpenWeatherMap's bulk ``city.list.json(.gz)``. It is parsed
+    once and saved as a compact sorted TSV next to it. ``load()`` is
+    blocking and meant to run on a worker thread after the UI is drawn.
+    """
+
+    # Prefix matches examined before ranking by name length
+    PREFIX_SCAN = 200
+    # Query trigrams one typo can change (a transposition touches four)
+    FUZZY_TYPO_GRAMS = 4
+    # Fuzzy matches may be this many characters longer or shorter
+    FUZZY_LENGTH_SLACK = 1
+    # Postings counted beyond the required ones, within the entry budget
+    FUZZY_EXTRA_POSTINGS = 2
+    FUZZY_BUDGET = 4000
+
+    def __init__(self, path: str):
+        self.path = path
+        self.loaded = False
+        self._lock = threading.Lock()
+        self._keys: List[str] = []  # normalized names, sorted
+        self._entries: List[CityEntry] = []  # parallel to _keys
+        self._lengths = array("H")  # parallel to _keys
+        self._trigrams: Dict[str, array] = {}
+
+    @property
+    def available(self) -> bool:
+        """Whether a gazetteer file exists to load."""
+        return os.path.exists(self._compiled_path) or os.path.exists(self.path)
+
+    # ---------------------------------------------------------
+    # LOADING
+    # ---------------------------------------------------------
+    def load(self):
+        """Load (and if needed compile) the index. Safe to call repeatedly."""
+        with self._lock:
+            if self.loaded:
+                return
+            if not os.path.exists(self._compiled_path):
+                self._compile()
+            self._read_compiled()
+            self._build_trigrams()
+            self.loaded = True
+
+    @property
+    def _compiled_path(self) -> str:
+        base = self.path[:-3] if self.path.endswith(".gz") else self.path
+        return os.path.splitext(base)[0] + ".index.tsv"
+
+    def _compile(self):
+        opener = gzip.open if self.path.endswith(".gz") else open
+        with opener(self.path, "rt", encoding="utf-8") as f:
+            cities = json.load(f)
+
+        rows = sorted(
+            (
+                normalize_name(c["name"]),
+                c["id"],
+                c["name"],
+                c.get("country", ""),
+                c["coord"]["lat"],
+                c["coord"]["lon"],
+            )
+            for c in cities
+            if c.get("name")
+        )
+        tmp_path = self._compiled_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for key, city_id, name, country, lat, lon in rows:
+                f.write(f"{key}\t{city_id}\t{name}\t{country}\t{lat}\t{lon}\n")
+        os.replace(tmp_path, self._compiled_path)
+
+    def _read_compiled(self):
+        keys, entries = [], []
+        with open(self._compiled_path, encoding="utf-8") as f:
+            for line in f:
+                key, city_id, name, country, lat, lon = (
+                    line.rstrip("\n").split("\t")
+                )
+                keys.append(key)
+                entries.append(
+                    CityEntry(
+                        int(city_id), name, country, float(lat), float(lon)
+                    )
+                )
+        self._keys, self._entries = keys, entries
+
+    def _build_trigrams(self):
+        lengths = array("H", (min(len(key), 0xFFFF) for key in self._keys))
+        postings: Dict[str, array] = {}
+        # Shortest names first, so each posting is ordered by name length
+        for position in sorted(range(len(lengths)), key=lengths.__getitem__):
+            for gram in trigrams(self._keys[position]):
+                posting = postings.get(gram)
+                if posting is None:
+                    posting = postings[gram] = array("I")
+                posting.append(position)
+        self._lengths, self._trigrams = lengths, postings
+
+    # ---------------------------------------------------------
+    # QUERIES
+    # ---------------------------------------------------------
+    def suggest(self, text: str, limit: int = 5) -> List[CityEntry]:
+        """
+        Suggest places for partially typed input.
+
+        Prefix matches come first; if there are none, the closest names by
+        trigram similarity are returned instead.
+        """
+        if not self.loaded:
+            return []
+        query = normalize_name(text.split(",")[0])
+        if not query:
+            return []
+
+        matches = self._prefix(query) or self._fuzzy(query, limit)
+
+        # Places with the same name and country look identical; show one
+        seen, unique = set(), []
+        for entry in matches:
+            if entry.label not in seen:
+                seen.add(entry.label)
+                unique.append(entry)
+        return unique[:limit]
+
+    def resolve(self, text: str) -> Optional[CityEntry]:
+        """
+        Resolve a typed name to a single place.
+
+        Accepts ``"Name"`` or ``"Name, CC"``. Returns None when the name is
+        unknown or ambiguous (several places share it and no country code
+        narrows it down), so the caller can fall back to a name query.
+        """
+        if not self.loaded:
+            return None
+        name, _, country = text.partition(",")
+        key = normalize_name(name)
+        country = country.strip().upper()
+
+        start = bisect.bisect_left(self._keys, key)
+        end = bisect.bisect_right(self._keys, key, lo=start)
+        candidates = [
+            entry
+            for entry in self._entries[start:end]
+            if not country or entry.country == country
+        ]
+        return candidates[0] if len(candidates) == 1 else None
+
+    def _prefix(self, query: str) -> List[CityEntry]:
+        start = bisect.bisect_left(self._keys, query)
+        end = min(start + self.PREFIX_SCAN, len(self._keys))
+        positions = []
+        for position in range(start, end):
+            if not self._keys[position].startswith(query):
+                break
+            positions.append(position)
+        # Shorter names first, so "london" ranks above "londonderry"
+        positions.sort(key=lambda p: len(self._keys[p]))
+        return [self._entries[position] for position in positions]
+
+    def _fuzzy(self, query: str, limit: int) -> List[CityEntry]:
+        grams = trigrams(query)
+        postings = sorted(
+            (self._trigrams[g] for g in grams if g in self._trigrams), key=len
+        )
+        # Trigrams no name has are among those the typo changed; a match
+        # misses at most the rest, so it is in one of the rarest `required`
+        required = max(
+            1, self.FUZZY_TYPO_GRAMS + 1 - (len(grams) - len(postings))
+        )
+        shortest = len(query) - self.FUZZY_LENGTH_SLACK
+        longest = len(query) + self.FUZZY_LENGTH_SLACK
+
+        counts: Counter = Counter()
+        counted = 0
+        for i, posting in enumerate(
+            postings[:required + self.FUZZY_EXTRA_POSTINGS]
+        ):
+            start = self._length_bound(posting, shortest)
+            end = self._length_bound(posting, longest + 1)
+            # Postings are never cut short; an extra one that would go over
+            # the budget is skipped, with the longer ones after it
+            if i >= required and counted + end - start > self.FUZZY_BUDGET:
+                break
+            counts.update(posting[start:end])
+            counted += end - start
+
+        shortlist = [position for position, _ in counts.most_common(limit * 8)]
+
+        def similarity(position: int) -> float:
+            other = trigrams(self._keys[position])
+            return len(grams & other) / len(grams | other)
+
+        shortlist.sort(key=similarity, reverse=True)
+        return [self._entries[position] for position in shortlist[:limit * 2]]
+
+    def _length_bound(self, posting: array, length: int) -> int:
+        """Index of the first name in a posting at least ``length`` long."""
+        lengths = self._lengths
+        low, high = 0, len(posting)
+        while low < high:
+            middle = (low + high) // 2
+            if lengths[posting[middle]] < length:
+                low = middle + 1
+            else:
+                high = middle
+        return low
@@ -0,0 +1,216 @@
+# cli.py
+"""Headless batch lookups with WeatherService, streamed as JSON lines.
+
+Reads one place per line from a file or stdin: a city name ("Paris, FR")
+or coordinates ("48.85,2.35"). Blank lines and lines starting with "#" are
+skipped. Places are fetched by a bounded pool of workers, and each result
+is written to stdout as one JSON line as soon as it completes (so output
+is in completion order; every line carries its input line number).
+
+Memory stays flat however long the input is: input is read lazily, only
+in-flight items are tracked, and the service's caches are size-bounded.
+Batch runs leave no per-place state behind: observation history, the
+on-disk cache and icon downloads are turned off.
+
+With --checkpoint, progress is saved as a watermark (every line up to it
+is done) plus the few lines above it that finished out of order. A rerun
+with the same checkpoint skips them. Failed lookups count as done (their
+error is in the output). Results are checkpointed only after they are
+written, so a crash can repeat (never lose) a few lines.
+
+Per-run stats are printed to stderr as JSON when the run ends.
+
+Usage:
+    python cli.py [INPUT] [--concurrency 8] [--rate-limit 600]
+        [--checkpoint run.ckpt] >> results.jsonl
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import time
+from collections import defaultdict, deque
+from dataclasses import asdict
+from typing import Dict, Iterator, Optional, Set, TextIO, Tuple, Union
+
+COORDINATES = re.compile(
+    r"^\s*(-?\d+(?:\.\d+)?)\s*,\s*(-?\d+(?:\.\d+)?)\s*$"
+)
+
+Query = Union[str, Tuple[float, float]]
+
+
+def parse_line(line: str) -> Optional[Query]:
+    """A city name or (lat, lon) tuple, or None for blank/comment lines."""
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+    match = COORDINATES.match(line)
+    if match:
+        return float(match.group(1)), float(match.group(2))
+    return line
+
+
+class Checkpoint:
+    """
+    Resumable progress over numbered input lines.
+
+    ``watermark`` is the highest line number such that every line up to
+    it is done; ``done`` holds finished lines above it. Saved atomically
+    as JSON.
+    """
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self.watermark = 0
+        self.done: Set[int] = set()
+        self.unsaved = 0
+        if path and os.path.exists(path):
+            with open(path) as f:
+                state = json.load(f)
+            self.watermark = state["watermark"]
+            self.done = set(state["done"])
+
+    def is_done(self, line_no: int) -> bool:
+        return line_no <= self.watermark or line_no in self.done
+
+    def mark(self, line_no: int):
+        self.done.add(line_no)
+        self.unsaved += 1
+
+    def advance(self, line_no: int):
+        """Mark lines that need no work (blank, comments) as done."""
+        self.done.add(line_no)
+
+    def save(self):
+        # Fold the contiguous run above the watermark into it
+        while self.watermark + 1 in self.done:
+            self.watermark += 1
+            self.done.discard(self.watermark)
+        self.unsaved = 0
+        if not self.path:
+            return
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(
+                {"watermark": self.watermark, "done": sorted(self.done)}, f
+            )
+        os.replace(tmp_path, self.path)
+
+
+async def run(args, source: TextIO, out: TextIO) -> Dict:
+    from config import Config
+    from weather_service import WeatherService, WeatherServiceError
+
+    if args.rate_limit:
+        Config.RATE_LIMIT_PER_MINUTE = args.rate_limit
+    # Every distinct place would add a history file and a disk cache row
+    Config.HISTORY_DIR = ""
+    Config.DISK_CACHE_PATH = ""
+    Config.ICON_PREFETCH = False
+    checkpoint = Checkpoint(args.checkpoint)
+    # Input line numbers of in-flight queries (duplicates queue up FIFO)
+    in_flight: Dict[Query, deque] = defaultdict(deque)
+    errors: Dict[str, int] = defaultdict(int)
+    stats = {"skipped": 0, "ok": 0, "failed": 0}
+
+    def queries() -> Iterator[Query]:
+        for line_no, line in enumerate(source, start=1):
+            if checkpoint.is_done(line_no):
+                stats["skipped"] += 1
+                continue
+            query = parse_line(line)
+            if query is None:
+                checkpoint.advance(line_no)
+                continue
+            in_flight[query].append(line_no)
+            yield query
+
+    started = time.perf_counter()
+    service = WeatherService()
+    try:
+        async for query, result in service.get_weather_many(
+            queries(), concurrency=args.concurrency or Config.BATCH_CONCURRENCY
+        ):
+            line_no = in_flight[query].popleft()
+            if not in_flight[query]:
+                del in_flight[query]
+
+            record = {
+                "line": line_no,
+                "query": list(query) if isinstance(query, tuple) else query,
+            }
+            if isinstance(result, WeatherServiceError):
+                stats["failed"] += 1
+                errors[type(result).__name__] += 1
+                record["error"] = str(result)
+            else:
+                stats["ok"] += 1
+                record["weather"] = result._asdict()
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+
+            checkpoint.mark(line_no)
+            if checkpoint.unsaved >= args.checkpoint_every:
+                checkpoint.save()
+    finally:
+        checkpoint.save()
+        await service.aclose()
+
+    elapsed = time.perf_counter() - started
+    fetched = stats["ok"] + stats["failed"]
+    return {
+        **stats,
+        "errors": dict(errors),
+        "elapsed_s": round(elapsed, 3),
+        "per_second": round(fetched / elapsed, 2) if elapsed else 0.0,
+        "retries": service.retries,
+        "cache": asdict(service.cache_stats),
+        "watermark": checkpoint.watermark,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "input", nargs="?", default="-", help="input file (default: stdin)"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=None,
+        help="parallel lookups (default: Config.BATCH_CONCURRENCY)",
+    )
+    parser.add_argument(
+        "--rate-limit", type=float, default=None,
+        help="requests per minute (default: Config.RATE_LIMIT_PER_MINUTE)",
+    )
+    parser.add_argument("--checkpoint", help="file to resume progress from")
+    parser.add_argument(
+        "--checkpoint-every", type=int, default=100,
+        help="results between checkpoint saves",
+    )
+    args = parser.parse_args()
+
+    source = (
+        sys.stdin
+        if args.input == "-"
+        else open(args.input, encoding="utf-8")
+    )
+    try:
+        stats = asyncio.run(run(args, source, sys.stdout))
+    except ValueError as e:
+        # Missing API key, or input that is not valid UTF-8
+        print(str(e), file=sys.stderr)
+        sys.exit(2)
+    except KeyboardInterrupt:
+        sys.exit(130)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+    print(json.dumps(stats), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
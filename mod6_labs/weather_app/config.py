@@ -2,20 +2,20 @@
 """Configuration management for the Weather App."""
 
 import os
-from dotenv import load_dotenv
-
-# Load environment variables from .env file
-load_dotenv()
 
 class Config:
-    """Application configuration."""
+    """Application configuration.
+
+    Settings read from the environment (and the .env file) are filled in
+    by ``load()``, which runs on first use through ``validate()`` rather
+    than at import time, so importing this module stays cheap.
+    """
     
-    # API Configuration
-    API_KEY = os.getenv("OPENWEATHER_API_KEY", "")
-    BASE_URL = os.getenv(
-        "OPENWEATHER_BASE_URL", 
-        "https://api.openweathermap.org/data/2.5/weather"
-    )
+    # API Configuration (see load())
+    API_KEY = ""
+    BASE_URL = ""
+    FORECAST_URL = ""  # defaults to BASE_URL's sibling /forecast
+    AIR_QUALITY_URL = ""  # defaults to BASE_URL's sibling /air_pollution
     
     # App Configuration
     APP_TITLE = "Weather App"
@@ -25,16 +25,136 @@ class Config:
     # API Settings
     UNITS = "metric"  # metric, imperial, or standard
     TIMEOUT = 10  # seconds
+
+    # Connection Pool Settings
+    MAX_CONNECTIONS = 10
+    MAX_KEEPALIVE_CONNECTIONS = 10  # below MAX_CONNECTIONS, bursts churn sockets
+    KEEPALIVE_EXPIRY = 30  # seconds
+    HTTP2 = False  # see load()
+
+    # Response Cache Settings
+    CACHE_TTL = 600  # seconds a response is considered fresh
+    CACHE_MAX_ENTRIES = 256
+    CACHE_STALE_WHILE_REVALIDATE = True
+    CACHE_STALE_TTL = 3600  # seconds a stale response may still be served
+
+    # Coordinate Cache Settings
+    COORD_GRID_SIZE = 0.05  # degrees per grid cell
+    COORD_MAX_DISTANCE_KM = 5  # farthest cached cell that may answer a query
+    COORD_MAX_AGE = 600  # seconds a coordinate observation stays usable
+    COORD_CACHE_MAX_ENTRIES = 4096
+
+    # Disk Cache Settings (set the path to "" to disable)
+    DISK_CACHE_PATH = os.path.join(
+        os.path.dirname(__file__), "weather_cache.db"
+    )
+    DISK_CACHE_FLUSH_INTERVAL = 2  # seconds between batched writes
+    DISK_CACHE_MAX_ENTRIES = 4096  # responses kept; oldest fetched trimmed
+
+    # Observation History Settings (needs NumPy; set the dir to "" to disable)
+    HISTORY_DIR = os.path.join(os.path.dirname(__file__), "history")
+    HISTORY_CAPACITY = 90 * 24 * 6  # samples per city: 90 days every 10 min
+    HISTORY_FLUSH_INTERVAL = 60  # seconds between saves of changed histories
+    HISTORY_MAX_CITIES = 64  # histories kept in memory; the rest stay on disk
+
+    # City Index Settings (OpenWeatherMap bulk city.list.json.gz)
+    CITY_LIST_PATH = ""  # see load()
+    SUGGESTION_LIMIT = 5
+    SEARCH_DEBOUNCE = 0.2  # seconds to wait for more input before searching
+    PREFETCH_TOP_SUGGESTION = False  # warm the cache for an exact match
+    RESOLVER_MAX_ENTRIES = 1024  # learned name -> city ID mappings kept
+
+    # Forecast Settings
+    FORECAST_SLOTS = 5  # 3-hour forecast entries shown on the card
+
+    # Icon Cache Settings (served from the Flet assets directory)
+    ASSETS_DIR = os.path.join(os.path.dirname(__file__), "assets")
+    ICON_CACHE_DIR = os.path.join(ASSETS_DIR, "icons")
+    ICON_ASSET_PREFIX = "/icons"
+    ICON_CACHE_MAX_FILES = 32
+    ICON_PREFETCH = True  # download icons as results arrive (needs network)
+
+    # Resilience Settings
+    RETRY_ATTEMPTS = 3  # total tries for timeouts, network errors, 429 and 5xx
+    RETRY_BASE_DELAY = 0.5  # seconds, doubled per attempt (with jitter)
+    RETRY_MAX_DELAY = 8  # seconds; a longer Retry-After is not waited for
+    BREAKER_FAILURE_THRESHOLD = 5  # consecutive failures that open the circuit
+    BREAKER_RESET_TIMEOUT = 30  # seconds before a trial request is allowed
+    RATE_LIMIT_PER_MINUTE = 60  # OpenWeatherMap free tier quota
+    RATE_LIMIT_BURST = 10
+
+    # Background Refresh Settings
+    WATCH_CITIES = []  # see load(); always refreshed, plus the shown city
+    REFRESH_INTERVAL = 600  # seconds between refreshes of a watched city
+    REFRESH_MIN_INTERVAL = 300  # floor while conditions keep changing
+    REFRESH_MAX_INTERVAL = 3600  # ceiling while conditions hold steady
+    REFRESH_JITTER = 0.2  # +/- fraction of the interval, to avoid bursts
+    REFRESH_SPREAD = 3  # seconds to stagger immediate refreshes over
+
+    # Metrics Settings (see load(); off by default)
+    METRICS_ENABLED = False  # record request timings and cache lookups
+    METRICS_PORT = 0  # serve a Prometheus snapshot on localhost if set
+    METRICS_FILE = ""  # or write it to this file periodically
+    METRICS_FILE_INTERVAL = 15  # seconds between file writes
+    METRICS_OVERLAY = False  # show request timings in the app window
+
+    # Batch Settings
+    BATCH_CONCURRENCY = 8  # parallel lookups in get_weather_many
+
+    _loaded = False
+
+    @classmethod
+    def load(cls):
+        """Read environment settings (and the .env file) once."""
+        if cls._loaded:
+            return
+        from dotenv import load_dotenv
+
+        # Load environment variables from .env file
+        load_dotenv()
+
+        cls.API_KEY = os.getenv("OPENWEATHER_API_KEY", "")
+        cls.BASE_URL = os.getenv(
+            "OPENWEATHER_BASE_URL",
+            "https://api.openweathermap.org/data/2.5/weather"
+        )
+        api_root = cls.BASE_URL.rsplit("/", 1)[0]
+        cls.FORECAST_URL = os.getenv(
+            "OPENWEATHER_FORECAST_URL", f"{api_root}/forecast"
+        )
+        cls.AIR_QUALITY_URL = os.getenv(
+            "OPENWEATHER_AIR_QUALITY_URL", f"{api_root}/air_pollution"
+        )
+        cls.HTTP2 = os.getenv("OPENWEATHER_HTTP2", "").lower() in (
+            "1", "true", "yes"
+        )
+        cls.CITY_LIST_PATH = os.getenv(
+            "OPENWEATHER_CITY_LIST",
+            os.path.join(os.path.dirname(__file__), "city.list.json.gz"),
+        )
+        cls.METRICS_ENABLED = os.getenv(
+            "OPENWEATHER_METRICS", ""
+        ).lower() in ("1", "true", "yes")
+        cls.METRICS_PORT = int(os.getenv("OPENWEATHER_METRICS_PORT", "0"))
+        cls.METRICS_FILE = os.getenv("OPENWEATHER_METRICS_FILE", "")
+        cls.METRICS_OVERLAY = os.getenv(
+            "OPENWEATHER_METRICS_OVERLAY", ""
+        ).lower() in ("1", "true", "yes")
+        # Semicolon-separated, since names may contain commas ("Paris, FR")
+        cls.WATCH_CITIES = [
+            city.strip()
+            for city in os.getenv("OPENWEATHER_WATCH_CITIES", "").split(";")
+            if city.strip()
+        ]
+        cls._loaded = True
     
     @classmethod
     def validate(cls):
         """Validate that required configuration is present."""
+        cls.load()
         if not cls.API_KEY:
             raise ValueError(
                 "OPENWEATHER_API_KEY not found. "
                 "Please create a .env file with your API key."
             )
-        return True
-
-# Validate configuration on import
-Config.validate()
\ No newline at end of file
+        return True
\ No newline at end of file
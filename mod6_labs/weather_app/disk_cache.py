@@ -0,0 +1,263 @@
+# disk_cache.py
+"""Persistent SQLite cache of the last weather response per query."""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# What a missing, locked or corrupt database file raises
+DISK_ERRORS = (sqlite3.Error, OSError, ValueError)
+
+
+class DiskCache:
+    """
+    On-disk store of the last response per cache key, with fetch timestamps.
+
+    Writes are buffered in memory and flushed in batches on a worker thread,
+    so the event loop never waits on SQLite. Reads also run off the loop and
+    see buffered writes that have not been flushed yet.
+
+    Only the ``max_entries`` most recently fetched responses are kept. It
+    also stores the names learned by LocationResolver, keeping only the
+    ``max_locations`` most recently learned.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        flush_interval: float = 2.0,
+        batch_size: int = 32,
+        max_entries: int = 4096,
+        max_locations: int = 1024,
+    ):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_entries = max_entries
+        self.max_locations = max_locations
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Tuple[Dict, float]] = {}
+        self._pending_meta: Dict[str, str] = {}
+        self._pending_locations: Dict[str, Tuple[list, float]] = {}
+        # Batch currently being written by a worker thread
+        self._writing: Dict[str, Tuple[Dict, float]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._batch_full: Optional[asyncio.Event] = None
+
+    # ---------------------------------------------------------
+    # PUBLIC API
+    # ---------------------------------------------------------
+    def put(self, key: str, data: Dict, fetched_at: float):
+        """Queue a response to be written on the next batch flush."""
+        self._pending[key] = (data, fetched_at)
+        self._schedule_flush()
+
+    def set_meta(self, name: str, value: str):
+        """Queue a small named value (e.g. the last viewed city)."""
+        self._pending_meta[name] = value
+        self._schedule_flush()
+
+    def put_location(self, query: str, row: list, used_at: float):
+        """Queue a resolved name (see LocationResolver) to be written."""
+        self._pending_locations[query] = (row, used_at)
+        self._schedule_flush()
+
+    async def get(self, key: str) -> Optional[Tuple[Dict, float]]:
+        """
+        Look up the stored response for a key.
+
+        Returns:
+            Tuple of (data, fetched_at), or None if nothing is stored
+        """
+        entry = self._pending.get(key) or self._writing.get(key)
+        if entry is not None:
+            return entry
+        return await asyncio.to_thread(self._read, key)
+
+    async def get_meta(self, name: str) -> Optional[str]:
+        """Look up a named value stored with ``set_meta``."""
+        if name in self._pending_meta:
+            return self._pending_meta[name]
+        return await asyncio.to_thread(self._read_meta, name)
+
+    async def get_locations(self, limit: int) -> List[Tuple[str, list]]:
+        """
+        Load stored resolved names.
+
+        Returns:
+            Up to ``limit`` (query, row) pairs, oldest first
+        """
+        return await asyncio.to_thread(self._read_locations, limit)
+
+    async def flush(self):
+        """Write all buffered entries to disk now."""
+        if (
+            not self._pending
+            and not self._pending_meta
+            and not self._pending_locations
+        ):
+            return
+        entries, self._pending = self._pending, {}
+        meta, self._pending_meta = self._pending_meta, {}
+        locations, self._pending_locations = self._pending_locations, {}
+        self._writing.update(entries)
+        try:
+            await asyncio.to_thread(self._write, entries, meta, locations)
+        finally:
+            for key, entry in entries.items():
+                if self._writing.get(key) is entry:
+                    del self._writing[key]
+
+    async def aclose(self):
+        """Flush buffered writes and close the database."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        await self.flush()
+        await asyncio.to_thread(self._close)
+
+    # ---------------------------------------------------------
+    # BATCHING
+    # ---------------------------------------------------------
+    def _schedule_flush(self):
+        if self._flush_task is None:
+            self._batch_full = asyncio.Event()
+            self._flush_task = asyncio.create_task(self._flush_later())
+        if len(self._pending) >= self.batch_size:
+            self._batch_full.set()
+
+    async def _flush_later(self):
+        # A full batch is written right away, otherwise after a delay
+        try:
+            await asyncio.wait_for(self._batch_full.wait(), self.flush_interval)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            self._flush_task = None
+        try:
+            await self.flush()
+        except DISK_ERRORS as e:
+            # Nobody awaits this task; the batch is lost, the app goes on
+            logger.warning("Disk cache write failed: %s", e)
+
+    # ---------------------------------------------------------
+    # SQLITE (runs on worker threads)
+    # ---------------------------------------------------------
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS weather (
+                    key TEXT PRIMARY KEY,
+                    payload TEXT NOT NULL,
+                    fetched_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS meta (
+                    name TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS locations (
+                    query TEXT PRIMARY KEY,
+                    place TEXT NOT NULL,
+                    used_at REAL NOT NULL
+                )
+                """
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _write(
+        self,
+        entries: Dict[str, Tuple[Dict, float]],
+        meta: Dict[str, str],
+        locations: Dict[str, Tuple[list, float]],
+    ):
+        rows = [
+            (key, json.dumps(data, separators=(",", ":")), fetched_at)
+            for key, (data, fetched_at) in entries.items()
+        ]
+        location_rows = [
+            (query, json.dumps(row, separators=(",", ":")), used_at)
+            for query, (row, used_at) in locations.items()
+        ]
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                if rows:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO weather "
+                        "(key, payload, fetched_at) VALUES (?, ?, ?)",
+                        rows,
+                    )
+                    # Keep only the most recently fetched responses
+                    conn.execute(
+                        "DELETE FROM weather WHERE key NOT IN ("
+                        "SELECT key FROM weather "
+                        "ORDER BY fetched_at DESC LIMIT ?)",
+                        (self.max_entries,),
+                    )
+                conn.executemany(
+                    "INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)",
+                    meta.items(),
+                )
+                if location_rows:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO locations "
+                        "(query, place, used_at) VALUES (?, ?, ?)",
+                        location_rows,
+                    )
+                    # Keep only the most recently learned names
+                    conn.execute(
+                        "DELETE FROM locations WHERE query NOT IN ("
+                        "SELECT query FROM locations "
+                        "ORDER BY used_at DESC LIMIT ?)",
+                        (self.max_locations,),
+                    )
+
+    def _read(self, key: str) -> Optional[Tuple[Any, float]]:
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT payload, fetched_at FROM weather WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def _read_meta(self, name: str) -> Optional[str]:
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT value FROM meta WHERE name = ?", (name,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def _read_locations(self, limit: int) -> List[Tuple[str, list]]:
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT query, place FROM ("
+                "SELECT query, place, used_at FROM locations "
+                "ORDER BY used_at DESC LIMIT ?) ORDER BY used_at",
+                (limit,),
+            ).fetchall()
+        return [(query, json.loads(place)) for query, place in rows]
+
+    def _close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
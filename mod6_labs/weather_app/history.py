@@ -0,0 +1,375 @@
+# history.py
+"""Per-city observation history in NumPy ring buffers."""
+
+import asyncio
+import os
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from models import WeatherSnapshot
+
+# One observation; packed, so a sample takes 24 bytes on disk and in memory
+SAMPLE_DTYPE = np.dtype(
+    [
+        ("t", "f8"),  # epoch seconds
+        ("temp", "f4"),
+        ("feels_like", "f4"),
+        ("humidity", "f4"),
+        ("wind_speed", "f4"),
+    ]
+)
+FIELDS = SAMPLE_DTYPE.names[1:]
+
+# Samples a new buffer holds before it first grows
+INITIAL_SAMPLES = 64
+
+
+def convert_units(
+    values: np.ndarray, field: str, from_units: str, to_units: str
+) -> np.ndarray:
+    """
+    Convert a column between OpenWeatherMap unit systems.
+
+    Args:
+        values: Array of samples of ``field``
+        field: One of FIELDS
+        from_units: "metric", "imperial" or "standard"
+        to_units: "metric", "imperial" or "standard"
+
+    Returns:
+        A new float64 array in ``to_units``
+    """
+    values = np.asarray(values, dtype="f8")
+    if from_units == to_units or field == "humidity":
+        return values.copy()
+
+    if field == "wind_speed":
+        # metric and standard are both m/s; imperial is mph
+        mps = values / 2.236936 if from_units == "imperial" else values
+        return mps * 2.236936 if to_units == "imperial" else mps
+
+    # Temperatures, via Celsius
+    if from_units == "imperial":
+        celsius = (values - 32) * 5 / 9
+    elif from_units == "standard":
+        celsius = values - 273.15
+    else:
+        celsius = values
+    if to_units == "imperial":
+        return celsius * 9 / 5 + 32
+    if to_units == "standard":
+        return celsius + 273.15
+    return celsius
+
+
+class CityHistory:
+    """
+    Ring buffer of up to ``capacity`` observations for one city.
+
+    Samples live in one structured array; ``samples()`` returns them in
+    time order. Statistics work on whole columns at once. The array starts
+    small and doubles as samples arrive, so memory follows the samples
+    actually written; it only wraps once it has reached ``capacity``.
+    """
+
+    def __init__(self, capacity: int, units: str):
+        self.capacity = capacity
+        self.units = units
+        self._data = np.zeros(min(capacity, INITIAL_SAMPLES), dtype=SAMPLE_DTYPE)
+        self._count = 0
+        self._head = 0  # index of the next write
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def last_time(self) -> float:
+        return float(self._data["t"][self._head - 1]) if self._count else 0.0
+
+    def append(self, snapshot: WeatherSnapshot):
+        self._reserve(1)
+        self._data[self._head] = (
+            snapshot.fetched_at,
+            snapshot.temp,
+            snapshot.feels_like,
+            snapshot.humidity,
+            snapshot.wind_speed,
+        )
+        self._head = (self._head + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def extend(self, samples: np.ndarray):
+        """Append samples in time order (keeps the newest ``capacity``)."""
+        samples = samples[-self.capacity:]
+        n = len(samples)
+        self._reserve(n)
+        first = min(n, self.capacity - self._head)
+        self._data[self._head:self._head + first] = samples[:first]
+        self._data[:n - first] = samples[first:]
+        self._head = (self._head + n) % self.capacity
+        self._count = min(self._count + n, self.capacity)
+
+    def _reserve(self, n: int):
+        """Grow the buffer to fit n more samples (up to ``capacity``)."""
+        size = len(self._data)
+        if size == self.capacity or self._count + n <= size:
+            return
+        # Not wrapped yet, so the samples are the first _count rows
+        grown = np.zeros(
+            min(self.capacity, max(2 * size, self._count + n)),
+            dtype=SAMPLE_DTYPE,
+        )
+        grown[:self._count] = self._data[:self._count]
+        self._data = grown
+
+    def samples(self, since: Optional[float] = None) -> np.ndarray:
+        """Samples in time order, optionally only those from ``since`` on."""
+        if self._count < self.capacity:
+            ordered = self._data[:self._count]
+        else:
+            ordered = np.concatenate(
+                (self._data[self._head:], self._data[:self._head])
+            )
+        if since is not None:
+            ordered = ordered[np.searchsorted(ordered["t"], since):]
+        return ordered
+
+    def series(
+        self,
+        field: str,
+        units: Optional[str] = None,
+        since: Optional[float] = None,
+    ) -> np.ndarray:
+        """One column as float64, converted to ``units`` if given."""
+        return convert_units(
+            self.samples(since)[field], field, self.units, units or self.units
+        )
+
+    def summary(
+        self, since: Optional[float] = None
+    ) -> Dict[str, Dict[str, float]]:
+        """Min, max and mean per field, e.g. ``summary()["temp"]["max"]``."""
+        samples = self.samples(since)
+        if not len(samples):
+            return {}
+        return {
+            field: {
+                "min": float(samples[field].min()),
+                "max": float(samples[field].max()),
+                "mean": float(samples[field].mean(dtype="f8")),
+            }
+            for field in FIELDS
+        }
+
+    def trend(self, field: str, since: Optional[float] = None) -> float:
+        """Least-squares slope of a field, in units per hour (0 if unknown)."""
+        samples = self.samples(since)
+        if len(samples) < 2:
+            return 0.0
+        hours = (samples["t"] - samples["t"][0]) / 3600
+        if hours[-1] == 0:
+            return 0.0
+        values = samples[field].astype("f8")
+        hours_centered = hours - hours.mean()
+        return float(
+            (hours_centered * (values - values.mean())).sum()
+            / (hours_centered ** 2).sum()
+        )
+
+    def downsample(
+        self, bucket_seconds: float, since: Optional[float] = None
+    ) -> np.ndarray:
+        """
+        Average samples into fixed time buckets (e.g. 3600 for hourly).
+
+        Returns:
+            Array of SAMPLE_DTYPE, one row per non-empty bucket, with ``t``
+            set to the bucket start
+        """
+        samples = self.samples(since)
+        if not len(samples):
+            return samples.copy()
+        buckets = np.floor(samples["t"] / bucket_seconds)
+        # Samples are in time order, so each bucket is a contiguous run
+        starts = np.flatnonzero(np.diff(buckets, prepend=np.nan))
+        counts = np.diff(np.append(starts, len(samples)))
+
+        result = np.empty(len(starts), dtype=SAMPLE_DTYPE)
+        result["t"] = buckets[starts] * bucket_seconds
+        for field in FIELDS:
+            sums = np.add.reduceat(samples[field].astype("f8"), starts)
+            result[field] = sums / counts
+        return result
+
+
+class HistoryStore:
+    """
+    Observation histories for all cities, persisted as ``.npy`` files.
+
+    ``record()`` is called with every fresh WeatherSnapshot and never
+    blocks: a city's file is loaded on a worker thread the first time it is
+    seen (memory-mapped, so only the newest ``capacity`` samples are read),
+    and changed histories are saved in the background every
+    ``flush_interval`` seconds.
+
+    Only the ``max_cities`` most recently used histories stay in memory.
+    An evicted history with unsaved samples is saved on the next flush
+    (and reloading it before then picks up those samples).
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        capacity: int,
+        units: str,
+        flush_interval: float,
+        max_cities: int = 64,
+    ):
+        self.directory = directory
+        self.capacity = capacity
+        self.units = units
+        self.flush_interval = flush_interval
+        self.max_cities = max_cities
+        self._histories: "OrderedDict[int, CityHistory]" = OrderedDict()
+        self._loading: Dict[int, asyncio.Task] = {}
+        self._pending: Dict[int, List[WeatherSnapshot]] = {}
+        self._dirty: set = set()
+        # Samples of evicted histories: waiting for, and during, a save
+        self._evicted: Dict[int, np.ndarray] = {}
+        self._saving: Dict[int, np.ndarray] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def record(self, snapshot: WeatherSnapshot):
+        """Add a snapshot to its city's history (stale ones are skipped)."""
+        if snapshot.stale or not snapshot.city_id:
+            return
+        history = self._histories.get(snapshot.city_id)
+        if history is None:
+            self._pending.setdefault(snapshot.city_id, []).append(snapshot)
+            self._start_load(snapshot.city_id)
+            return
+        self._histories.move_to_end(snapshot.city_id)
+        self._append(snapshot.city_id, history, snapshot)
+
+    async def get(self, city_id: int) -> CityHistory:
+        """The history of a city (see WeatherSnapshot.city_id)."""
+        history = self._histories.get(city_id)
+        if history is None:
+            await self._start_load(city_id)
+            history = self._histories[city_id]
+        self._histories.move_to_end(city_id)
+        return history
+
+    async def flush(self):
+        """Save every changed history now."""
+        dirty, self._dirty = self._dirty, set()
+        evicted, self._evicted = self._evicted, {}
+        if not dirty and not evicted:
+            return
+        # Copy on the loop; write on a worker thread
+        snapshots = {
+            city_id: self._histories[city_id].samples().copy()
+            for city_id in dirty
+        }
+        snapshots.update(evicted)
+        self._saving.update(evicted)
+        try:
+            await asyncio.to_thread(self._save, snapshots)
+        finally:
+            for city_id, samples in evicted.items():
+                if self._saving.get(city_id) is samples:
+                    del self._saving[city_id]
+
+    async def aclose(self):
+        """Save pending changes and stop background work."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        for task in list(self._loading.values()):
+            await asyncio.gather(task, return_exceptions=True)
+        await self.flush()
+
+    # ---------------------------------------------------------
+    # INTERNALS
+    # ---------------------------------------------------------
+    def _append(
+        self, city_id: int, history: CityHistory, snapshot: WeatherSnapshot
+    ):
+        # Cached results repeat a fetch; keep one sample per fetch
+        if snapshot.fetched_at <= history.last_time:
+            return
+        history.append(snapshot)
+        self._mark_dirty(city_id)
+
+    def _mark_dirty(self, city_id: int):
+        self._dirty.add(city_id)
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    def _start_load(self, city_id: int) -> asyncio.Task:
+        task = self._loading.get(city_id)
+        if task is None:
+            task = asyncio.create_task(self._load(city_id))
+            self._loading[city_id] = task
+        return task
+
+    async def _load(self, city_id: int):
+        try:
+            # Evicted samples not on disk yet are newer than the file
+            unsaved = self._evicted.pop(city_id, None)
+            if unsaved is not None:
+                samples = unsaved
+            elif city_id in self._saving:
+                samples = self._saving[city_id]
+            else:
+                samples = await asyncio.to_thread(self._read, city_id)
+            history = CityHistory(self.capacity, self.units)
+            if samples is not None:
+                history.extend(samples)
+            self._histories[city_id] = history
+            if unsaved is not None:
+                self._mark_dirty(city_id)
+            for snapshot in self._pending.pop(city_id, []):
+                self._append(city_id, history, snapshot)
+            self._evict()
+        finally:
+            self._loading.pop(city_id, None)
+
+    def _evict(self):
+        # Least recently used first; unsaved samples go to the next flush
+        while len(self._histories) > self.max_cities:
+            city_id, history = self._histories.popitem(last=False)
+            if city_id in self._dirty:
+                self._dirty.discard(city_id)
+                self._evicted[city_id] = history.samples().copy()
+
+    async def _flush_later(self):
+        try:
+            await asyncio.sleep(self.flush_interval)
+        finally:
+            self._flush_task = None
+        await self.flush()
+
+    def _path(self, city_id: int) -> str:
+        # One directory per unit system, so switching units never mixes them
+        return os.path.join(self.directory, self.units, f"{city_id}.npy")
+
+    def _read(self, city_id: int) -> Optional[np.ndarray]:
+        try:
+            stored = np.load(self._path(city_id), mmap_mode="r")
+        except (FileNotFoundError, ValueError):
+            return None
+        if stored.dtype != SAMPLE_DTYPE:
+            return None
+        return np.array(stored[-self.capacity:])
+
+    def _save(self, histories: Dict[int, np.ndarray]):
+        os.makedirs(os.path.join(self.directory, self.units), exist_ok=True)
+        for city_id, samples in histories.items():
+            path = self._path(city_id)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                np.save(f, samples)
+            os.replace(tmp_path, path)
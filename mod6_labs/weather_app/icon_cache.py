@@ -0,0 +1,130 @@
+# icon_cache.py
+"""Local, bounded on-disk cache of OpenWeatherMap condition icons."""
+
+import asyncio
+import os
+from typing import Dict, Iterable, Optional, Set
+
+import httpx
+
+ICON_URL = "https://openweathermap.org/img/wn/{code}@2x.png"
+
+
+class IconCache:
+    """
+    Download weather icons on first use and serve them from local assets.
+
+    Icons are stored under ``directory``, which must sit inside the Flet
+    ``assets_dir`` so ``src()`` can return an asset path. Until an icon has
+    been downloaded, ``src()`` falls back to the remote URL. The store is
+    bounded by ``max_files``; the least recently written icons are removed
+    first.
+
+    Downloads use a small HTTP client of their own, created on first use,
+    so they never share a pool (or request metrics) with the API calls.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        asset_prefix: str,
+        max_files: int,
+        timeout: float = 10,
+    ):
+        self.directory = directory
+        self.asset_prefix = asset_prefix
+        self.max_files = max_files
+        self.timeout = timeout
+        self._client: Optional[httpx.AsyncClient] = None
+        self._cached: Optional[Set[str]] = None
+        self._downloads: Dict[str, asyncio.Task] = {}
+
+    def src(self, code: str) -> str:
+        """Image source for an icon: the local asset if cached, else remote."""
+        if code in self._known():
+            return f"{self.asset_prefix}/{self._filename(code)}"
+        return ICON_URL.format(code=code)
+
+    def prefetch(self, codes: Iterable[str]):
+        """Start background downloads for icons that are not cached yet."""
+        for code in codes:
+            if code in self._known() or code in self._downloads:
+                continue
+            task = asyncio.create_task(self._download(code))
+            self._downloads[code] = task
+            task.add_done_callback(
+                lambda _, code=code: self._downloads.pop(code, None)
+            )
+
+    async def aclose(self):
+        """Cancel pending downloads and close the download client."""
+        for task in list(self._downloads.values()):
+            task.cancel()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @staticmethod
+    def likely_codes(code: str) -> list:
+        """An icon plus its day/night counterpart, e.g. 10d -> 10d, 10n."""
+        counterpart = code[:-1] + ("n" if code.endswith("d") else "d")
+        return [code, counterpart]
+
+    # ---------------------------------------------------------
+    # STORAGE
+    # ---------------------------------------------------------
+    def _known(self) -> Set[str]:
+        if self._cached is None:
+            try:
+                names = os.listdir(self.directory)
+            except FileNotFoundError:
+                names = []
+            self._cached = {
+                name.split("@")[0] for name in names if name.endswith("@2x.png")
+            }
+        return self._cached
+
+    @staticmethod
+    def _filename(code: str) -> str:
+        return f"{code}@2x.png"
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=2),
+            )
+        return self._client
+
+    async def _download(self, code: str):
+        try:
+            response = await self.client.get(ICON_URL.format(code=code))
+        except httpx.HTTPError:
+            return  # Keep using the remote URL; retry on a later prefetch
+        if response.status_code != 200:
+            return
+        evicted = await asyncio.to_thread(self._write, code, response.content)
+        self._known().add(code)
+        self._known().difference_update(evicted)
+
+    def _write(self, code: str, content: bytes) -> list:
+        """Store an icon and return the codes evicted to stay in bounds."""
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, self._filename(code))
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+        paths = [
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory)
+            if name.endswith("@2x.png")
+        ]
+        paths.sort(key=os.path.getmtime)
+        evicted = []
+        for old_path in paths[: max(0, len(paths) - self.max_files)]:
+            os.remove(old_path)
+            evicted.append(os.path.basename(old_path).split("@")[0])
+        return evicted
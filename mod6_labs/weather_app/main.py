@@ -1,24 +1,118 @@
 # main.py
 """Weather Application using Flet v0.28.3"""
 
+import asyncio
+import contextlib
+import functools
+import importlib
+import logging
 import flet as ft
-from weather_service import WeatherService
+from datetime import datetime, timedelta, timezone
+from scheduler import RefreshScheduler
+from search_controller import SearchController
 from config import Config
 
+logger = logging.getLogger(__name__)
+
+
+# Weather condition → background colors
+CONDITION_COLORS = {
+    "Clear": ft.Colors.YELLOW_200,
+    "Rain": ft.Colors.BLUE_200,
+    "Clouds": ft.Colors.GREY_300,
+    "Snow": ft.Colors.CYAN_100,
+    "Thunderstorm": ft.Colors.DEEP_PURPLE_200,
+    "Drizzle": ft.Colors.BLUE_100,
+    "Mist": ft.Colors.GREY_200,
+}
+
+# Weather emojis
+EMOJI_MAP = {
+    "Clear": "☀️",
+    "Rain": "🌧",
+    "Clouds": "☁️",
+    "Snow": "❄️",
+    "Thunderstorm": "⚡",
+    "Drizzle": "🌦",
+    "Mist": "🌫",
+}
+
 
 class WeatherApp:
     """Main Weather Application class."""
 
     def __init__(self, page: ft.Page):
         self.page = page
-        self.weather_service = WeatherService()
+        self.search = SearchController(debounce=Config.SEARCH_DEBOUNCE)
+
+        # The service layer (httpx, caches) is started after the first
+        # frame is drawn; see start_services()
+        self.weather_service = None
+        self.service_error = None
+        self.service_ready = asyncio.Event()
+
+        # Background refresh of the shown city and Config.WATCH_CITIES
+        self.scheduler = None
+        self.current_city = None
+        self.watch_data = {}  # latest data per watched city
+
+        # Metrics export (only when Config.METRICS_ENABLED)
+        self.metrics_exporter = None
 
         # New features:
         self.use_celsius = True           # Temperature unit preference
-        self.last_weather_data = None     # Stores last data to re-render after unit toggle
+        self.last_weather_data = None     # Last WeatherSnapshot, re-rendered on unit toggle
+        self.last_forecast = None         # Last Forecast, re-rendered on unit toggle
 
         self.setup_page()
         self.build_ui()
+        self.page.run_task(self.start_services)
+
+    async def start_services(self):
+        """Import and start the service layer without delaying first paint."""
+        try:
+            module = await asyncio.to_thread(
+                importlib.import_module, "weather_service"
+            )
+            self.weather_service = module.WeatherService()
+        except ValueError as e:
+            # Missing API key (validated on first use)
+            self.service_error = str(e)
+        except Exception as e:
+            # E.g. a missing dependency; searches show this instead
+            logger.exception("Weather service failed to start")
+            self.service_error = f"Could not start the weather service: {e}"
+        finally:
+            self.service_ready.set()
+        if self.service_error is not None:
+            self.show_error(self.service_error)
+            return
+
+        # Load the offline city index for autocomplete in the background
+        self.page.run_task(self.weather_service.load_city_index)
+
+        # Keep the watched cities up to date while the window is visible
+        self.scheduler = RefreshScheduler(
+            fetch=functools.partial(
+                self.weather_service.get_weather, refresh=True
+            ),
+            on_change=self.on_watch_change,
+            interval=Config.REFRESH_INTERVAL,
+            min_interval=Config.REFRESH_MIN_INTERVAL,
+            max_interval=Config.REFRESH_MAX_INTERVAL,
+            jitter=Config.REFRESH_JITTER,
+            spread=Config.REFRESH_SPREAD,
+        )
+        self.build_watch_list()
+        for city in Config.WATCH_CITIES:
+            self.scheduler.watch(city)
+        self.scheduler.start()
+
+        if self.weather_service.metrics is not None:
+            await self.start_metrics()
+
+        # Show the last viewed city from the disk cache, then refresh it
+        await self.restore_last_weather()
 
     # ---------------------------------------------------------
     # PAGE SETUP
@@ -31,10 +125,19 @@ class WeatherApp:
         self.page.window.width = Config.APP_WIDTH
         self.page.window.height = Config.APP_HEIGHT
         self.page.window.resizable = False
+        self.page.scroll = ft.ScrollMode.AUTO
 
         # Center the window on desktop
         self.page.window.center()
 
+        # Release pooled HTTP connections when the app shuts down
+        self.page.window.prevent_close = True
+        self.page.window.on_event = self.on_window_event
+        self.page.on_close = self.on_close
+
+        # Pause background refresh while the app is not visible
+        self.page.on_app_lifecycle_state_change = self.on_lifecycle_change
+
     # ---------------------------------------------------------
     # BUILD UI
     # ---------------------------------------------------------
@@ -56,8 +159,12 @@ class WeatherApp:
             prefix_icon=ft.Icons.LOCATION_CITY,
             autofocus=True,
             on_submit=self.on_search,
+            on_change=self.on_city_change,
         )
 
+        # As-you-type suggestions from the offline city index
+        self.suggestions = ft.Column(spacing=0, visible=False)
+
         # Search button
         self.search_button = ft.ElevatedButton(
             "Get Weather",
@@ -78,10 +185,12 @@ class WeatherApp:
 
         # Weather display container (initially hidden)
         self.weather_container = ft.Container(
+            content=self.build_weather_card(),
             visible=False,
             bgcolor=ft.Colors.YELLOW_50,
             border_radius=10,
             padding=20,
+            animate=ft.Animation(400, ft.AnimationCurve.EASE),
         )
 
         # Error message
@@ -91,9 +200,30 @@ class WeatherApp:
             visible=False,
         )
 
+        # Cached-data notice (shown while offline or refreshing)
+        self.stale_label = ft.Text(
+            "",
+            size=12,
+            italic=True,
+            color=ft.Colors.GREY_700,
+            visible=False,
+        )
+
+        # Watched cities (filled in once the config is loaded)
+        self.watch_list = ft.Column(spacing=0, visible=False)
+        self.watch_rows = {}
+
         # Loading indicator
         self.loading = ft.ProgressRing(visible=False)
 
+        # Request timing overlay (Config.METRICS_OVERLAY)
+        self.metrics_overlay = ft.Text(
+            "",
+            size=10,
+            color=ft.Colors.GREY_600,
+            visible=False,
+        )
+
         # Add all components to page
         self.page.add(
             ft.Column(
@@ -101,12 +231,16 @@ class WeatherApp:
                     self.title,
                     ft.Divider(height=20, color=ft.Colors.TRANSPARENT),
                     self.city_input,
+                    self.suggestions,
                     self.search_button,
                     self.unit_switch,
+                    self.watch_list,
                     ft.Divider(height=20, color=ft.Colors.TRANSPARENT),
                     self.loading,
                     self.error_message,
+                    self.stale_label,
                     self.weather_container,
+                    self.metrics_overlay,
                 ],
                 horizontal_alignment=ft.CrossAxisAlignment.CENTER,
                 spacing=10,
@@ -118,18 +252,133 @@ class WeatherApp:
     # ---------------------------------------------------------
     def on_search(self, e):
         """Handle search button click or enter key press."""
-        self.page.run_task(self.get_weather)
+        self.suggestions.visible = False
+        self.page.run_task(self.search.submit, self.get_weather)
+
+    def on_city_change(self, e):
+        """Show suggestions from the offline city index while typing."""
+        if self.weather_service is None:
+            return
+        city_index = self.weather_service.city_index
+        text = self.city_input.value.strip()
+        matches = (
+            city_index.suggest(text, Config.SUGGESTION_LIMIT)
+            if len(text) >= 2
+            else []
+        )
+
+        self.suggestions.controls = [
+            ft.TextButton(
+                entry.label,
+                icon=ft.Icons.PLACE,
+                # Bind the current entry with a default arg
+                on_click=lambda e, entry=entry: self.on_pick_suggestion(entry),
+            )
+            for entry in matches
+        ]
+        self.suggestions.visible = bool(matches)
+        self.page.update()
+
+        # Speculatively warm the cache when the typed name is an exact match
+        if Config.PREFETCH_TOP_SUGGESTION and matches:
+            entry = self.weather_service.resolver.resolve(text)
+            if entry is not None:
+                self.page.run_task(self.prefetch_city, entry.id)
+
+    def on_pick_suggestion(self, entry):
+        """Search for a suggested place."""
+        self.city_input.value = entry.label
+        self.suggestions.visible = False
+        self.page.run_task(self.search.submit, self.get_weather)
+
+    async def prefetch_city(self, city_id: int):
+        """Fetch a likely city into the cache, ignoring failures."""
+        from weather_service import WeatherServiceError
+
+        try:
+            await self.weather_service.get_weather_by_id(city_id)
+        except WeatherServiceError:
+            pass
 
     def on_unit_toggle(self, e):
         """Toggle between Celsius and Fahrenheit."""
         self.use_celsius = self.unit_switch.value
         self.unit_switch.label = "Use °C" if self.use_celsius else "Use °F"
 
-        # If weather already loaded, refresh the view
+        # If weather already loaded, only the temperatures change
         if self.last_weather_data:
-           self.display_weather(self.last_weather_data)
+            self.update_temperatures()
+        if self.last_forecast:
+            self.display_forecast(self.last_forecast)
+        for city in self.watch_data:
+            self.update_watch_row(city)
+        self.page.update()
 
-    async def get_weather(self):
+    def on_window_event(self, e):
+        """Close the service on exit; pause refresh while minimized."""
+        if e.type == ft.WindowEventType.CLOSE:
+            self.page.run_task(self.shutdown)
+        elif e.type in (ft.WindowEventType.MINIMIZE, ft.WindowEventType.HIDE):
+            self.set_refresh_paused(True)
+        elif e.type in (ft.WindowEventType.RESTORE, ft.WindowEventType.SHOW):
+            self.set_refresh_paused(False)
+
+    def on_lifecycle_change(self, e):
+        """Pause refresh while the app is in the background (mobile/web)."""
+        if e.state in (ft.AppLifecycleState.HIDE, ft.AppLifecycleState.PAUSE):
+            self.set_refresh_paused(True)
+        elif e.state in (ft.AppLifecycleState.SHOW, ft.AppLifecycleState.RESUME):
+            self.set_refresh_paused(False)
+
+    def set_refresh_paused(self, paused: bool):
+        if self.scheduler is None:
+            return
+        if paused:
+            self.scheduler.pause()
+        else:
+            self.scheduler.resume()
+
+    def on_close(self, e):
+        """Close the weather service when a web session ends."""
+        if self.scheduler is not None:
+            self.scheduler.stop()
+        if self.metrics_exporter is not None:
+            self.page.run_task(self.metrics_exporter.aclose)
+        if self.weather_service is not None:
+            self.page.run_task(self.weather_service.aclose)
+
+    async def shutdown(self):
+        """Release service resources, then destroy the window."""
+        try:
+            self.search.cancel()
+            if self.scheduler is not None:
+                self.scheduler.stop()
+            # One failing to close must not keep the others open
+            for resource in (self.metrics_exporter, self.weather_service):
+                if resource is None:
+                    continue
+                try:
+                    await resource.aclose()
+                except Exception:
+                    logger.exception("Closing %s failed", type(resource).__name__)
+        finally:
+            # The window closes even if releasing resources failed
+            self.page.window.destroy()
+
+    async def restore_last_weather(self):
+        """Render the last viewed city from disk, then refresh it."""
+        cached = await self.weather_service.load_last_viewed()
+        if cached is None or self.last_weather_data is not None:
+            return
+        if self.search.busy:
+            return  # The user already started a search
+
+        city, weather_data = cached
+        self.city_input.value = city
+        self.display_weather(weather_data)
+        await self.search.submit(self.get_weather, keep_previous=True)
+
+    async def get_weather(self, keep_previous: bool = False):
         """Fetch and display weather data."""
         city = self.city_input.value.strip()
 
@@ -137,152 +386,322 @@ class WeatherApp:
             self.show_error("Please enter a city name")
             return
 
-        # Show loading, hide previous results
+        # Show loading, hide previous results unless refreshing them
         self.loading.visible = True
         self.error_message.visible = False
-        self.weather_container.visible = False
+        if not keep_previous:
+            self.weather_container.visible = False
+            self.stale_label.visible = False
+            self.show_sections_loading()
         self.page.update()
 
         try:
-            weather_data = await self.weather_service.get_weather(city)
-            self.display_weather(weather_data)
+            await self.service_ready.wait()
+            if self.service_error is not None:
+                raise RuntimeError(self.service_error)
+
+            # Each section is rendered as soon as it arrives
+            sections = self.weather_service.get_weather_sections(city)
+            async with contextlib.aclosing(sections):
+                async for section, result in sections:
+                    if section == "current":
+                        if isinstance(result, Exception):
+                            raise result
+                        self.weather_service.remember_last_viewed(city)
+                        self.loading.visible = False
+                        self.display_weather(result)
+                        self.follow_city(city, result)
+                    elif section == "forecast":
+                        self.display_forecast(result)
+                        self.page.update()
+                    elif section == "air":
+                        self.display_air_quality(result)
+                        self.page.update()
 
         except Exception as e:
             self.show_error(str(e))
 
         finally:
             self.loading.visible = False
+            self.update_metrics_overlay()
+            self.page.update()
+
+    # ---------------------------------------------------------
+    # METRICS
+    # ---------------------------------------------------------
+    async def start_metrics(self):
+        """Publish service metrics and show the overlay if configured."""
+        from metrics import MetricsExporter
+
+        if Config.METRICS_PORT or Config.METRICS_FILE:
+            self.metrics_exporter = MetricsExporter(
+                self.weather_service.metrics,
+                port=Config.METRICS_PORT,
+                path=Config.METRICS_FILE,
+                interval=Config.METRICS_FILE_INTERVAL,
+            )
+            await self.metrics_exporter.start()
+        self.metrics_overlay.visible = Config.METRICS_OVERLAY
+
+    def update_metrics_overlay(self):
+        """Refresh the overlay text (only sent when it is shown)."""
+        if self.metrics_overlay.visible:
+            self.metrics_overlay.value = (
+                self.weather_service.metrics.overlay_text()
+            )
+
+    # ---------------------------------------------------------
+    # BACKGROUND REFRESH
+    # ---------------------------------------------------------
+    def follow_city(self, city: str, data):
+        """Keep the shown city refreshed in place of the previous one."""
+        if self.scheduler is None or city == self.current_city:
+            return
+        if (
+            self.current_city is not None
+            and self.current_city not in Config.WATCH_CITIES
+        ):
+            self.scheduler.unwatch(self.current_city)
+        self.current_city = city
+        self.scheduler.watch(city, data)
+
+    def on_watch_change(self, city: str, data):
+        """Apply a refresh whose displayed fields changed."""
+        if city in self.watch_rows:
+            self.watch_data[city] = data
+            self.update_watch_row(city)
+        if city == self.current_city and not self.search.busy:
+            self.display_weather(data)  # also sends the row update
+        else:
             self.page.update()
 
+    def build_watch_list(self):
+        """Create one row per watched city; values arrive from refreshes."""
+        for city in Config.WATCH_CITIES:
+            self.watch_rows[city] = ft.TextButton(
+                f"{city} …",
+                icon=ft.Icons.PLACE,
+                on_click=lambda e, city=city: self.on_pick_watched(city),
+            )
+        self.watch_list.controls = list(self.watch_rows.values())
+        self.watch_list.visible = bool(self.watch_rows)
+        self.page.update()
+
+    def update_watch_row(self, city: str):
+        """Render a watched city's condition and temperature in its row."""
+        data = self.watch_data[city]
+        temp, unit = self.convert_temperature(data.temp)
+        self.watch_rows[city].text = (
+            f"{city}  {EMOJI_MAP.get(data.condition, '🌍')} {temp:.1f}{unit}"
+        )
+
+    def on_pick_watched(self, city: str):
+        """Show a watched city in the weather card."""
+        self.city_input.value = city
+        self.suggestions.visible = False
+        self.page.run_task(self.search.submit, self.get_weather)
+
     # ---------------------------------------------------------
     # DISPLAY WEATHER
     # ---------------------------------------------------------
-    def display_weather(self, data: dict):
-        """Display weather information with styling and transitions."""
+    def display_weather(self, data):
+        """Display a WeatherSnapshot with styling and transitions.
+
+        The card's controls are created once in ``build_weather_card``;
+        this only assigns new values, so ``page.update()`` sends just the
+        properties that changed.
+        """
 
         self.last_weather_data = data
 
-        # Extract data
-        city_name = data.get("name", "Unknown")
-        country = data.get("sys", {}).get("country", "")
-        temp_c = data.get("main", {}).get("temp", 0)
-        feels_c = data.get("main", {}).get("feels_like", 0)
-        humidity = data.get("main", {}).get("humidity", 0)
-        description = data.get("weather", [{}])[0].get("description", "").title()
-        condition = data.get("weather", [{}])[0].get("main", "")
-        icon_code = data.get("weather", [{}])[0].get("icon", "01d")
-        wind_speed = data.get("wind", {}).get("speed", 0)
-
-        # Temperature conversion
-        if self.use_celsius:
-            temp = temp_c
-            feels = feels_c
-            unit = "°C"
+        # Smooth background transition
+        self.weather_container.bgcolor = CONDITION_COLORS.get(
+            data.condition, ft.Colors.AMBER_100
+        )
+
+        emoji = EMOJI_MAP.get(data.condition, "🌍")
+
+        # Update card values
+        self.city_label.value = f"{data.name}, {data.country}"
+        self.weather_icon.src = self.weather_service.icons.src(data.icon)
+        self.description_label.value = f"{emoji} {data.description.title()}"
+        self.humidity_value.value = f"{data.humidity}%"
+        self.wind_value.value = f"{data.wind_speed} m/s"
+        self.update_temperatures()
+
+        # Mark cached data that could not be refreshed
+        if data.stale:
+            fetched_at = datetime.fromtimestamp(data.fetched_at)
+            self.stale_label.value = (
+                f"Showing cached data from {fetched_at:%b %d, %H:%M}"
+            )
+            self.stale_label.visible = True
         else:
-            temp = temp_c * 9/5 + 32
-            feels = feels_c * 9/5 + 32
-            unit = "°F"
-
-        # Weather condition → background colors
-        condition_colors = {
-            "Clear": ft.Colors.YELLOW_200,
-            "Rain": ft.Colors.BLUE_200,
-            "Clouds": ft.Colors.GREY_300,
-            "Snow": ft.Colors.CYAN_100,
-            "Thunderstorm": ft.Colors.DEEP_PURPLE_200,
-            "Drizzle": ft.Colors.BLUE_100,
-            "Mist": ft.Colors.GREY_200,
-        }
-        new_color = condition_colors.get(condition, ft.Colors.AMBER_100)
+            self.stale_label.visible = False
 
-        # Smooth background transition
-        self.weather_container.bgcolor = new_color
-        self.weather_container.animate = ft.Animation(400, ft.AnimationCurve.EASE)
-
-        # Weather emojis
-        emoji_map = {
-            "Clear": "☀️",
-            "Rain": "🌧",
-            "Clouds": "☁️",
-            "Snow": "❄️",
-            "Thunderstorm": "⚡",
-            "Drizzle": "🌦",
-            "Mist": "🌫",
-        }
-        emoji = emoji_map.get(condition, "🌍")
-
-        # Build UI
-        self.weather_container.content = ft.Column(
+        self.weather_container.visible = True
+        self.error_message.visible = False
+        self.page.update()
+
+    def update_temperatures(self):
+        """Render the temperature Texts in the selected unit."""
+        temp, unit = self.convert_temperature(self.last_weather_data.temp)
+        feels, _ = self.convert_temperature(self.last_weather_data.feels_like)
+
+        self.temp_label.value = f"{temp:.1f}{unit}"
+        self.feels_label.value = f"Feels like {feels:.1f}{unit}"
+
+    def convert_temperature(self, temp_c: float):
+        """Convert a Celsius value to the selected unit: (value, symbol)."""
+        if self.use_celsius:
+            return temp_c, "°C"
+        return temp_c * 9/5 + 32, "°F"
+
+    # ---------------------------------------------------------
+    # FORECAST AND AIR QUALITY
+    # ---------------------------------------------------------
+    def show_sections_loading(self):
+        """Show placeholders until the forecast and air quality arrive."""
+        self.last_forecast = None
+        self.forecast_status.value = "Loading forecast…"
+        self.forecast_status.visible = True
+        self.forecast_row.visible = False
+        self.air_label.value = "Air quality: loading…"
+
+    def display_forecast(self, forecast):
+        """Fill the forecast slots, or show why they are empty."""
+        if isinstance(forecast, Exception) or not forecast.entries:
+            self.forecast_status.value = "Forecast unavailable"
+            self.forecast_status.visible = True
+            self.forecast_row.visible = False
+            return
+
+        self.last_forecast = forecast
+        offset = timezone(timedelta(seconds=forecast.timezone))
+        for slot, entry in zip(self.forecast_row.controls, forecast.entries):
+            time_text, icon, temp_text = slot.controls
+            time_text.value = f"{datetime.fromtimestamp(entry.time, offset):%H:%M}"
+            icon.src = self.weather_service.icons.src(entry.icon)
+            temp, unit = self.convert_temperature(entry.temp)
+            temp_text.value = f"{temp:.0f}{unit}"
+        self.forecast_status.visible = False
+        self.forecast_row.visible = True
+
+    def display_air_quality(self, air):
+        """Show the air quality index and fine particles, or a placeholder."""
+        if isinstance(air, Exception):
+            self.air_label.value = "Air quality unavailable"
+            return
+        self.air_label.value = (
+            f"Air quality: {air.label} (AQI {air.aqi}) · "
+            f"PM2.5 {air.pm2_5:.0f} µg/m³"
+        )
+
+    # ---------------------------------------------------------
+    # WEATHER CARD
+    # ---------------------------------------------------------
+    def build_weather_card(self):
+        """Create the weather card's controls once; values are set later."""
+        self.city_label = ft.Text("", size=24, weight=ft.FontWeight.BOLD)
+        self.weather_icon = ft.Image(
+            src="https://openweathermap.org/img/wn/01d@2x.png",
+            width=100,
+            height=100,
+        )
+        self.description_label = ft.Text("", size=20, italic=True)
+        self.temp_label = ft.Text(
+            "",
+            size=48,
+            weight=ft.FontWeight.BOLD,
+            color=ft.Colors.BLUE_900,
+        )
+        self.feels_label = ft.Text("", size=16, color=ft.Colors.GREY_700)
+        self.humidity_value = self.create_info_value()
+        self.wind_value = self.create_info_value()
+
+        # Forecast and air quality sections, filled in as they arrive
+        self.forecast_status = ft.Text(
+            "", size=12, italic=True, color=ft.Colors.GREY_700
+        )
+        self.forecast_row = ft.Row(
+            [self.create_forecast_slot() for _ in range(Config.FORECAST_SLOTS)],
+            alignment=ft.MainAxisAlignment.SPACE_EVENLY,
+            visible=False,
+        )
+        self.air_label = ft.Text("", size=14, color=ft.Colors.BLUE_900)
+
+        return ft.Column(
             [
-                ft.Text(
-                    f"{city_name}, {country}",
-                    size=24,
-                    weight=ft.FontWeight.BOLD,
-                ),
+                self.city_label,
 
                 ft.Row(
-                    [
-                        ft.Image(
-                            src=f"https://openweathermap.org/img/wn/{icon_code}@2x.png",
-                            width=100,
-                            height=100,
-                        ),
-                        ft.Text(f"{emoji} {description}", size=20, italic=True),
-                    ],
+                    [self.weather_icon, self.description_label],
                     alignment=ft.MainAxisAlignment.CENTER,
                 ),
 
-                ft.Text(
-                    f"{temp:.1f}{unit}",
-                    size=48,
-                    weight=ft.FontWeight.BOLD,
-                    color=ft.Colors.BLUE_900,
-                ),
-
-                ft.Text(
-                    f"Feels like {feels:.1f}{unit}",
-                    size=16,
-                    color=ft.Colors.GREY_700,
-                ),
+                self.temp_label,
+                self.feels_label,
 
                 ft.Divider(),
 
                 ft.Row(
                     [
                         self.create_info_card(
-                            ft.Icons.WATER_DROP, "Humidity", f"{humidity}%"
+                            ft.Icons.WATER_DROP, "Humidity", self.humidity_value
                         ),
                         self.create_info_card(
-                            ft.Icons.AIR, "Wind Speed", f"{wind_speed} m/s"
+                            ft.Icons.AIR, "Wind Speed", self.wind_value
                         ),
                     ],
                     alignment=ft.MainAxisAlignment.SPACE_EVENLY,
                 ),
+
+                ft.Divider(),
+
+                self.forecast_status,
+                self.forecast_row,
+                self.air_label,
             ],
             horizontal_alignment=ft.CrossAxisAlignment.CENTER,
             spacing=10,
         )
 
-        self.weather_container.visible = True
-        self.error_message.visible = False
-        self.page.update()
+    def create_forecast_slot(self):
+        """Create one forecast column: time, icon and temperature."""
+        return ft.Column(
+            [
+                ft.Text("", size=12, color=ft.Colors.GREY_700),
+                ft.Image(
+                    src="https://openweathermap.org/img/wn/01d@2x.png",
+                    width=40,
+                    height=40,
+                ),
+                ft.Text("", size=14, weight=ft.FontWeight.BOLD),
+            ],
+            horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+            spacing=2,
+        )
 
     # ---------------------------------------------------------
     # INFO CARD
     # ---------------------------------------------------------
-    def create_info_card(self, icon, label, value):
+    def create_info_value(self):
+        """Create the value Text shown in an info card."""
+        return ft.Text(
+            "",
+            size=16,
+            weight=ft.FontWeight.BOLD,
+            color=ft.Colors.BLUE_900,
+        )
+
+    def create_info_card(self, icon, label, value: ft.Text):
         """Create an info card for weather details."""
         return ft.Container(
             content=ft.Column(
                 [
                     ft.Icon(icon, size=30, color=ft.Colors.BLUE_700),
                     ft.Text(label, size=12, color=ft.Colors.GREY_600),
-                    ft.Text(
-                        value,
-                        size=16,
-                        weight=ft.FontWeight.BOLD,
-                        color=ft.Colors.BLUE_900,
-                    ),
+                    value,
                 ],
                 horizontal_alignment=ft.CrossAxisAlignment.CENTER,
                 spacing=5,
@@ -301,6 +720,7 @@ class WeatherApp:
         self.error_message.value = f"❌ {message}"
         self.error_message.visible = True
         self.weather_container.visible = False
+        self.stale_label.visible = False
         self.page.update()
 
 
@@ -312,4 +732,4 @@ def main(page: ft.Page):
 
 
 if __name__ == "__main__":
-    ft.app(target=main)
+    ft.app(target=main, assets_dir=Config.ASSETS_DIR)
@@ -0,0 +1,296 @@
+# metrics.py
+"""Request timing histograms and Prometheus-style export."""
+
+import asyncio
+import bisect
+import functools
+import logging
+import os
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+def log_buckets(start: float, factor: float, count: int) -> List[float]:
+    """Upper bounds ``start, start*factor, ...`` (``count`` of them)."""
+    return [start * factor ** i for i in range(count)]
+
+
+# Bucket bounds by metric name suffix: 0.25 ms .. 32 s, and 64 B .. 1 MB
+BUCKETS = {
+    "_seconds": log_buckets(0.00025, 2, 18),
+    "_bytes": log_buckets(64, 2, 15),
+}
+
+# httpcore trace events (without the "http11."/"http2." prefix) -> phase.
+# DNS resolution happens inside connect_tcp and is reported as "connect".
+TRACE_PHASES = {
+    "connect_tcp": "connect",
+    "start_tls": "tls",
+    "send_request_headers": "send",
+    "receive_response_headers": "wait",
+    "receive_response_body": "body",
+}
+
+
+class Histogram:
+    """Fixed log-spaced buckets; ``observe`` is a bisect and two adds."""
+
+    def __init__(self, bounds: List[float]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile (approximate)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for bound, count in zip(self.bounds, self.counts):
+            cumulative += count
+            if cumulative >= rank:
+                return bound
+        return self.bounds[-1]
+
+
+class Metrics:
+    """
+    In-process registry of counters, gauges and histograms with labels.
+
+    Metric names follow Prometheus conventions: histograms end in
+    ``_seconds`` or ``_bytes`` (which picks their buckets), counters in
+    ``_total``. Gauges are read from a callback at render time, so the
+    hot path never updates them. ``render()`` returns the text
+    exposition format.
+    """
+
+    def __init__(self, prefix: str = "weather"):
+        self.prefix = prefix
+        self._histograms: Dict[Tuple[str, Tuple], Histogram] = {}
+        self._counters: Dict[Tuple[str, Tuple], float] = {}
+        self._gauges: Dict[Tuple[str, Tuple], Callable[[], float]] = {}
+
+    def observe(self, name: str, value: float, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            bounds = next(
+                bounds
+                for suffix, bounds in BUCKETS.items()
+                if name.endswith(suffix)
+            )
+            histogram = self._histograms[key] = Histogram(bounds)
+        histogram.observe(value)
+
+    def inc(self, name: str, amount: float = 1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        self._counters[key] = self._counters.get(key, 0) + amount
+
+    def register_gauge(self, name: str, read: Callable[[], float], **labels):
+        """Report ``read()`` as the gauge's value whenever it is rendered."""
+        self._gauges[(name, tuple(sorted(labels.items())))] = read
+
+    def gauge(self, name: str, **labels) -> Optional[float]:
+        read = self._gauges.get((name, tuple(sorted(labels.items()))))
+        return read() if read is not None else None
+
+    def histogram(self, name: str, **labels) -> Optional[Histogram]:
+        return self._histograms.get((name, tuple(sorted(labels.items()))))
+
+    def counter(self, name: str, **labels) -> float:
+        return self._counters.get((name, tuple(sorted(labels.items()))), 0)
+
+    def render(self) -> str:
+        """Snapshot in the Prometheus text exposition format."""
+        lines = []
+        typed = set()
+
+        for (name, labels), value in sorted(self._counters.items()):
+            full = f"{self.prefix}_{name}"
+            if full not in typed:
+                typed.add(full)
+                lines.append(f"# TYPE {full} counter")
+            lines.append(f"{full}{_labels(labels)} {value:g}")
+
+        for (name, labels), read in sorted(
+            self._gauges.items(), key=lambda item: item[0]
+        ):
+            full = f"{self.prefix}_{name}"
+            if full not in typed:
+                typed.add(full)
+                lines.append(f"# TYPE {full} gauge")
+            lines.append(f"{full}{_labels(labels)} {read():g}")
+
+        for (name, labels), histogram in sorted(
+            self._histograms.items(), key=lambda item: item[0]
+        ):
+            full = f"{self.prefix}_{name}"
+            if full not in typed:
+                typed.add(full)
+                lines.append(f"# TYPE {full} histogram")
+            cumulative = 0
+            for bound, count in zip(histogram.bounds, histogram.counts):
+                cumulative += count
+                bucket_labels = _labels(labels + (("le", f"{bound:g}"),))
+                lines.append(f"{full}_bucket{bucket_labels} {cumulative}")
+            inf_labels = _labels(labels + (("le", "+Inf"),))
+            lines.append(f"{full}_bucket{inf_labels} {histogram.count}")
+            lines.append(f"{full}_sum{_labels(labels)} {histogram.sum:g}")
+            lines.append(f"{full}_count{_labels(labels)} {histogram.count}")
+
+        return "\n".join(lines) + "\n"
+
+    def overlay_text(self) -> str:
+        """One-line p50 summary of request phases, for the debug overlay."""
+        parts = []
+        for phase in ("connect", "tls", "wait", "body"):
+            histogram = self.histogram("http_phase_seconds", phase=phase)
+            if histogram is not None:
+                parts.append(f"{phase} {histogram.quantile(0.5) * 1000:.0f}ms")
+        parse = self.histogram("parse_seconds")
+        if parse is not None:
+            parts.append(f"parse {parse.quantile(0.5) * 1000:.1f}ms")
+        hits = self.counter("cache_lookups_total", result="hit")
+        misses = self.counter("cache_lookups_total", result="miss")
+        parts.append(f"cache {hits:g}/{hits + misses:g}")
+        return " · ".join(parts)
+
+
+def _labels(labels: Tuple) -> str:
+    if not labels:
+        return ""
+    inner = ",".join(f'{key}="{value}"' for key, value in labels)
+    return "{" + inner + "}"
+
+
+class HttpInstrumentation:
+    """
+    httpx event hooks that time each request attempt by phase.
+
+    The request hook attaches an httpcore ``trace`` callback, which reports
+    connect (including DNS), TLS, send, wait (server time to first byte)
+    and body phases. The response hook reads the body, then records the
+    total time, status code and response size.
+    """
+
+    def __init__(self, metrics: Metrics):
+        self.metrics = metrics
+
+    @property
+    def event_hooks(self) -> Dict[str, list]:
+        return {"request": [self.on_request], "response": [self.on_response]}
+
+    async def on_request(self, request: httpx.Request):
+        started: Dict[str, float] = {}
+        request.extensions["trace"] = functools.partial(self._trace, started)
+        request.extensions["metrics_started"] = time.perf_counter()
+
+    async def on_response(self, response: httpx.Response):
+        await response.aread()
+        started = response.request.extensions.get("metrics_started")
+        if started is not None:
+            self.metrics.observe(
+                "http_request_seconds", time.perf_counter() - started
+            )
+        self.metrics.inc("http_responses_total", status=response.status_code)
+        self.metrics.observe("http_response_bytes", len(response.content))
+
+    async def _trace(self, started: Dict[str, float], event: str, info: dict):
+        step, _, stage = event.rpartition(".")
+        phase = TRACE_PHASES.get(step.partition(".")[2])
+        if phase is None:
+            return
+        if stage == "started":
+            started[step] = time.perf_counter()
+        elif stage == "complete" and step in started:
+            self.metrics.observe(
+                "http_phase_seconds",
+                time.perf_counter() - started.pop(step),
+                phase=phase,
+            )
+            if phase == "connect":
+                self.metrics.inc("http_connections_opened_total")
+
+
+class MetricsExporter:
+    """
+    Publish ``Metrics.render()`` on a local HTTP port and/or to a file.
+
+    The endpoint answers every GET (e.g. ``/metrics``) and only listens on
+    localhost. The file is rewritten atomically every ``interval`` seconds.
+    """
+
+    def __init__(
+        self,
+        metrics: Metrics,
+        port: int = 0,
+        path: str = "",
+        interval: float = 15,
+    ):
+        self.metrics = metrics
+        self.port = port
+        self.path = path
+        self.interval = interval
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._writer: Optional[asyncio.Task] = None
+
+    async def start(self):
+        if self.port:
+            self._server = await asyncio.start_server(
+                self._handle, "127.0.0.1", self.port
+            )
+            logger.info("Serving metrics on http://127.0.0.1:%d/", self.port)
+        if self.path:
+            self._writer = asyncio.create_task(self._write_periodically())
+
+    async def aclose(self):
+        if self._writer is not None:
+            self._writer.cancel()
+            self._writer = None
+            await asyncio.to_thread(self._write, self.metrics.render())
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, reader, writer):
+        try:
+            await reader.readuntil(b"\r\n\r\n")
+            body = self.metrics.render().encode()
+            writer.write(
+                b"HTTP/1.1 200 OK\r\n"
+                b"Content-Type: text/plain; version=0.0.4\r\n"
+                + f"Content-Length: {len(body)}\r\n".encode()
+                + b"Connection: close\r\n\r\n"
+                + body
+            )
+            await writer.drain()
+        except (
+            asyncio.IncompleteReadError,
+            asyncio.LimitOverrunError,  # headers past the stream limit
+            ConnectionError,
+        ):
+            pass
+        finally:
+            writer.close()
+
+    async def _write_periodically(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await asyncio.to_thread(self._write, self.metrics.render())
+
+    def _write(self, text: str):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.write(text)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,152 @@
+# models.py
+"""Typed weather data shared by the service, caches and UI."""
+
+import sys
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+
+class WeatherSnapshot(NamedTuple):
+    """
+    The fields of an OpenWeatherMap response that the app uses.
+
+    A tuple with named fields and no per-instance ``__dict__``, so it is
+    immutable and a fraction of the size of the parsed JSON it replaces.
+    Repeated strings (country, condition, description, icon) are interned
+    so thousands of snapshots share them. Caches store snapshots as-is;
+    the disk cache stores ``to_row()``, a plain JSON array.
+    """
+
+    city_id: int
+    name: str
+    country: str
+    lat: float
+    lon: float
+    temp: float
+    feels_like: float
+    humidity: int
+    wind_speed: float  # in the units of Config.UNITS
+    condition: str  # e.g. "Rain"
+    description: str  # e.g. "light rain"
+    icon: str  # e.g. "10d"
+    fetched_at: float  # epoch seconds
+    stale: bool = False  # served from the disk cache after a failed fetch
+
+    @property
+    def label(self) -> str:
+        return f"{self.name}, {self.country}" if self.country else self.name
+
+    @classmethod
+    def from_payload(
+        cls, data: Dict[str, Any], fetched_at: float
+    ) -> "WeatherSnapshot":
+        """Parse a current-weather API response."""
+        main = data.get("main", {})
+        coord = data.get("coord", {})
+        condition = (data.get("weather") or [{}])[0]
+        return cls(
+            city_id=data.get("id", 0),
+            name=data.get("name", "Unknown"),
+            country=sys.intern(data.get("sys", {}).get("country", "")),
+            lat=coord.get("lat", 0.0),
+            lon=coord.get("lon", 0.0),
+            temp=main.get("temp", 0.0),
+            feels_like=main.get("feels_like", 0.0),
+            humidity=main.get("humidity", 0),
+            wind_speed=data.get("wind", {}).get("speed", 0.0),
+            condition=sys.intern(condition.get("main", "")),
+            description=sys.intern(condition.get("description", "")),
+            icon=sys.intern(condition.get("icon", "01d")),
+            fetched_at=fetched_at,
+        )
+
+    def to_row(self) -> list:
+        """Serialize as a JSON-friendly list, in field order."""
+        return list(self)
+
+    @classmethod
+    def from_row(
+        cls, row: Any, fetched_at: float
+    ) -> Optional["WeatherSnapshot"]:
+        """
+        Rebuild a snapshot stored with ``to_row()``.
+
+        Raw response dicts written by older versions are parsed instead.
+        Returns None for rows in an unknown layout.
+        """
+        if isinstance(row, dict):
+            return cls.from_payload(row, fetched_at)
+        if not isinstance(row, list) or len(row) != len(cls._fields):
+            return None
+        return cls(*row)
+
+
+class ForecastEntry(NamedTuple):
+    """One 3-hour slot of the 5-day forecast."""
+
+    time: float  # epoch seconds
+    temp: float
+    condition: str
+    icon: str
+
+
+class Forecast(NamedTuple):
+    """The 5-day / 3-hour forecast for a place."""
+
+    entries: Tuple[ForecastEntry, ...]
+    timezone: int  # the place's UTC offset in seconds
+    fetched_at: float
+
+    @classmethod
+    def from_payload(
+        cls, data: Dict[str, Any], fetched_at: float
+    ) -> "Forecast":
+        """Parse a forecast API response."""
+        entries = []
+        for item in data.get("list", []):
+            condition = (item.get("weather") or [{}])[0]
+            entries.append(
+                ForecastEntry(
+                    time=item.get("dt", 0),
+                    temp=item.get("main", {}).get("temp", 0.0),
+                    condition=sys.intern(condition.get("main", "")),
+                    icon=sys.intern(condition.get("icon", "01d")),
+                )
+            )
+        return cls(
+            tuple(entries),
+            data.get("city", {}).get("timezone", 0),
+            fetched_at,
+        )
+
+
+class AirQuality(NamedTuple):
+    """Current air pollution at a place."""
+
+    aqi: int  # 1 (good) to 5 (very poor)
+    pm2_5: float  # μg/m³
+    pm10: float
+    o3: float
+    no2: float
+    fetched_at: float
+
+    LABELS = {1: "Good", 2: "Fair", 3: "Moderate", 4: "Poor", 5: "Very Poor"}
+
+    @property
+    def label(self) -> str:
+        return self.LABELS.get(self.aqi, "Unknown")
+
+    @classmethod
+    def from_payload(
+        cls, data: Dict[str, Any], fetched_at: float
+    ) -> "AirQuality":
+        """Parse an air pollution API response."""
+        item = (data.get("list") or [{}])[0]
+        components = item.get("components", {})
+        return cls(
+            aqi=item.get("main", {}).get("aqi", 0),
+            pm2_5=components.get("pm2_5", 0.0),
+            pm10=components.get("pm10", 0.0),
+            o3=components.get("o3", 0.0),
+            no2=components.get("no2", 0.0),
+            fetched_at=fetched_at,
+        )
@@ -0,0 +1,165 @@
+# resilience.py
+"""Retry, circuit breaker and rate limiting for upstream API calls."""
+
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class RetryPolicy:
+    """Jittered exponential backoff for idempotent requests."""
+
+    def __init__(self, attempts: int, base_delay: float, max_delay: float):
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        Seconds to wait before retry number ``attempt + 1``.
+
+        Uses "full jitter": a random delay up to the exponential backoff cap,
+        so clients that failed together do not retry together. A server's
+        Retry-After is honoured as a lower bound.
+        """
+        backoff = min(self.max_delay, self.base_delay * 2 ** attempt)
+        delay = random.uniform(0, backoff)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    @staticmethod
+    def parse_retry_after(value: Optional[str]) -> Optional[float]:
+        """Parse a Retry-After header (delta-seconds or HTTP-date)."""
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            when = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class CircuitBreaker:
+    """
+    Stop calling an upstream that keeps failing.
+
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    ``allow()`` returns False for ``reset_timeout`` seconds. It then goes
+    half-open and lets one trial request through: a success closes it, a
+    failure opens it again. Every allowed request must report back with
+    ``record_success``, ``record_failure`` or, if it was abandoned,
+    ``release``. State changes are logged and passed to every listener as
+    ``(old_state, new_state)``.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.listeners: List[Callable[[str, str], None]] = []
+        self._opened_at = 0.0
+        self._trial_started_at: Optional[float] = None
+
+    def allow(self) -> bool:
+        """Whether a request may be sent now."""
+        if self.state == self.OPEN:
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            self._transition(self.HALF_OPEN)
+        if self.state == self.HALF_OPEN:
+            # One trial at a time (a trial that never reported back expires)
+            now = time.monotonic()
+            if (
+                self._trial_started_at is not None
+                and now - self._trial_started_at < self.reset_timeout
+            ):
+                return False
+            self._trial_started_at = now
+        return True
+
+    def record_success(self):
+        self.failures = 0
+        self._trial_started_at = None
+        if self.state != self.CLOSED:
+            self._transition(self.CLOSED)
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial_started_at = None
+        if (
+            self.state == self.HALF_OPEN
+            or self.failures >= self.failure_threshold
+        ):
+            self._opened_at = time.monotonic()
+            if self.state != self.OPEN:
+                self._transition(self.OPEN)
+
+    def release(self):
+        """Report a request that ended without an outcome (e.g. cancelled)."""
+        self._trial_started_at = None
+
+    def _transition(self, state: str):
+        old_state, self.state = self.state, state
+        logger.info("Circuit breaker %s -> %s", old_state, state)
+        for listener in self.listeners:
+            listener(old_state, state)
+
+
+class TokenBucket:
+    """
+    Client-side rate limiter shared by every caller of a service.
+
+    Tokens refill continuously at ``rate_per_minute``, up to ``burst``.
+    Callers that find the bucket empty queue in FIFO order instead of
+    sending a request that would come back as 429.
+    """
+
+    def __init__(self, rate_per_minute: float, burst: int):
+        self.rate = rate_per_minute / 60
+        self.burst = burst
+        self.waiting = 0
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of callers waiting for a token."""
+        return self.waiting
+
+    async def acquire(self):
+        """Wait until a request may be sent, then take one token."""
+        self.waiting += 1
+        try:
+            async with self._lock:
+                while True:
+                    self._refill()
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    await asyncio.sleep((1 - self._tokens) / self.rate)
+        finally:
+            self.waiting -= 1
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(
+            self.burst, self._tokens + (now - self._updated_at) * self.rate
+        )
+        self._updated_at = now
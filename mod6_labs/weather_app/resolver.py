@@ -0,0 +1,142 @@
+# resolver.py
+"""Resolution of typed place names to canonical OpenWeatherMap city IDs."""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from city_index import CityEntry, CityIndex, normalize_name
+from disk_cache import DISK_ERRORS, DiskCache
+from models import WeatherSnapshot
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_query(text: str) -> str:
+    """
+    Normalize a name query so spellings of one place compare equal.
+
+    Each comma-separated part is case-folded, accent-stripped and
+    whitespace-collapsed, so "London ", "london" and "LONDON" match, as do
+    "London,GB" and "london, gb".
+    """
+    return ",".join(normalize_name(part) for part in text.split(","))
+
+
+class LocationResolver:
+    """
+    Maps typed names to places, learning from the API's answers.
+
+    Names the offline CityIndex resolves unambiguously need no learning.
+    Any other name is sent once as a ``q=`` query; the city ID and
+    coordinates in the response are then remembered for its normalized
+    spelling, so every later lookup (in any spelling that normalizes the
+    same) goes by ID and shares one cache entry.
+
+    Learned names are kept in an LRU of ``max_entries`` and persisted in
+    the DiskCache, which keeps the most recently learned ones, so they
+    survive restarts. If the cache cannot be read, names are only learned
+    in memory. ``resolve()`` never touches the disk or the event
+    loop, so UI callbacks may call it from any thread.
+    """
+
+    def __init__(
+        self,
+        city_index: CityIndex,
+        max_entries: int,
+        disk_cache: Optional[DiskCache] = None,
+    ):
+        self.city_index = city_index
+        self.max_entries = max_entries
+        self.disk_cache = disk_cache
+        self._learned: "OrderedDict[str, CityEntry]" = OrderedDict()
+        self._loading: Optional[asyncio.Task] = None
+        self._loaded = disk_cache is None
+
+    def __len__(self) -> int:
+        return len(self._learned)
+
+    async def load(self):
+        """Load learned names from the disk cache. Safe to call repeatedly."""
+        if self._loaded:
+            return
+        if self._loading is None:
+            self._loading = asyncio.ensure_future(self._load())
+        try:
+            await asyncio.shield(self._loading)
+        except Exception:
+            # Let the next call try again rather than re-raise this
+            self._loading = None
+            raise
+
+    def resolve(self, text: str) -> Optional[CityEntry]:
+        """
+        The place a typed name refers to, or None if it is not known yet.
+
+        Args:
+            text: City name as typed, e.g. "london" or "Paris, FR"
+        """
+        query = normalize_query(text)
+        entry = self._learned.get(query)
+        if entry is not None:
+            self._learned.move_to_end(query)
+            return entry
+        return self.city_index.resolve(text)
+
+    def learn(self, text: str, snapshot: WeatherSnapshot):
+        """
+        Remember the place a name query was answered with.
+
+        The place's own "Name, CC" label is learned too (unless it already
+        maps somewhere), so "London" and "London, GB" cost one request.
+        """
+        if not snapshot.city_id or snapshot.stale:
+            return
+        entry = CityEntry(
+            snapshot.city_id,
+            snapshot.name,
+            snapshot.country,
+            snapshot.lat,
+            snapshot.lon,
+        )
+        query = normalize_query(text)
+        if self._learned.get(query) != entry:
+            self._store(query, entry)
+            self._persist(query, entry)
+        label = normalize_query(entry.label)
+        if label not in self._learned:
+            self._store(label, entry)
+            self._persist(label, entry)
+
+    # ---------------------------------------------------------
+    # INTERNALS
+    # ---------------------------------------------------------
+    def _store(self, query: str, entry: CityEntry):
+        self._learned[query] = entry
+        self._learned.move_to_end(query)
+        while len(self._learned) > self.max_entries:
+            self._learned.popitem(last=False)
+
+    def _persist(self, query: str, entry: CityEntry):
+        # Writes are batched by the disk cache
+        if self.disk_cache is not None:
+            self.disk_cache.put_location(query, list(entry), time.time())
+
+    async def _load(self):
+        try:
+            rows = await self.disk_cache.get_locations(self.max_entries)
+        except DISK_ERRORS as e:
+            # An unreadable cache must not break lookups; learn in memory
+            logger.warning("Learned names not loaded, not persisting: %s", e)
+            self.disk_cache = None
+            rows = []
+        # Oldest first, and names learned meanwhile win over stored ones
+        learned, self._learned = self._learned, OrderedDict()
+        for query, row in rows:
+            if len(row) == len(CityEntry._fields):
+                self._store(query, CityEntry(*row))
+        for query, entry in learned.items():
+            self._store(query, entry)
+        self._loaded = True
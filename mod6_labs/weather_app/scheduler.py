@@ -0,0 +1,183 @@
+# scheduler.py
+"""Background refresh of watched cities."""
+
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from models import WeatherSnapshot
+
+logger = logging.getLogger(__name__)
+
+
+def fingerprint(snapshot: WeatherSnapshot) -> Tuple:
+    """The fields of a snapshot the UI shows (temps, condition, humidity...)."""
+    return (
+        snapshot.temp,
+        snapshot.feels_like,
+        snapshot.condition,
+        snapshot.description,
+        snapshot.humidity,
+        snapshot.wind_speed,
+        snapshot.stale,
+    )
+
+
+@dataclass
+class _Watch:
+    city: str
+    interval: float
+    due: float
+    fingerprint: Optional[Tuple] = None
+
+
+class RefreshScheduler:
+    """
+    Periodically refresh a watch list of cities.
+
+    Each city has its own interval. It is halved (down to ``min_interval``)
+    when a refresh shows changed conditions, and grows by ``BACKOFF`` (up to
+    ``max_interval``) while they stay the same or the fetch fails. Every
+    due time is jittered by +/- ``jitter`` of the interval so watched cities
+    drift apart instead of refreshing in bursts.
+
+    ``on_change(city, data)`` is called only when a displayed field
+    (see ``fingerprint``) differs from the previous refresh. ``pause()``
+    stops refreshing, e.g. while the window is minimized; ``resume()``
+    staggers overdue refreshes over ``spread`` seconds.
+
+    All methods must be called on the event loop.
+    """
+
+    BACKOFF = 1.5
+
+    def __init__(
+        self,
+        fetch: Callable[[str], Awaitable[WeatherSnapshot]],
+        on_change: Callable[[str, WeatherSnapshot], Any],
+        interval: float,
+        min_interval: float,
+        max_interval: float,
+        jitter: float = 0.2,
+        spread: float = 3.0,
+    ):
+        self.fetch = fetch
+        self.on_change = on_change
+        self.interval = interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.jitter = jitter
+        self.spread = spread
+        self.paused = False
+        self._watches: Dict[str, _Watch] = {}
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def watched(self) -> List[str]:
+        return list(self._watches)
+
+    def watch(self, city: str, data: Optional[WeatherSnapshot] = None):
+        """
+        Add a city to the watch list.
+
+        Args:
+            city: City name, as passed to ``fetch``
+            data: The data already on screen for the city. The first
+                refresh is then due after a full interval and only reported
+                if it differs; without it the city is refreshed within
+                ``spread`` seconds.
+        """
+        if city in self._watches:
+            return
+        if data is None:
+            delay = random.uniform(0, self.spread)
+        else:
+            delay = self._jittered(self.interval)
+        self._watches[city] = _Watch(
+            city,
+            self.interval,
+            time.monotonic() + delay,
+            fingerprint(data) if data is not None else None,
+        )
+        self._wake.set()
+
+    def unwatch(self, city: str):
+        """Remove a city from the watch list."""
+        self._watches.pop(city, None)
+
+    def start(self):
+        """Start the refresh loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        """Stop the refresh loop."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def pause(self):
+        """Stop refreshing until ``resume()``."""
+        self.paused = True
+
+    def resume(self):
+        """Resume refreshing; overdue cities are staggered over ``spread``."""
+        if not self.paused:
+            return
+        self.paused = False
+        now = time.monotonic()
+        for watch in self._watches.values():
+            if watch.due <= now:
+                watch.due = now + random.uniform(0, self.spread)
+        self._wake.set()
+
+    # ---------------------------------------------------------
+    # LOOP
+    # ---------------------------------------------------------
+    async def _run(self):
+        while True:
+            self._wake.clear()
+            timeout = None
+            if not self.paused:
+                now = time.monotonic()
+                for watch in list(self._watches.values()):
+                    if watch.due <= now and not self.paused:
+                        await self._refresh(watch)
+                if self._watches:
+                    next_due = min(w.due for w in self._watches.values())
+                    timeout = max(0.0, next_due - time.monotonic())
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _refresh(self, watch: _Watch):
+        try:
+            data = await self.fetch(watch.city)
+        except Exception as e:
+            # Keep what is on screen and try again later
+            logger.info("Refresh of %s failed: %s", watch.city, e)
+            watch.interval = min(self.max_interval, watch.interval * 2)
+            watch.due = time.monotonic() + self._jittered(watch.interval)
+            return
+
+        new = fingerprint(data)
+        if watch.fingerprint is not None:
+            if new != watch.fingerprint:
+                watch.interval = max(self.min_interval, watch.interval / 2)
+            else:
+                watch.interval = min(
+                    self.max_interval, watch.interval * self.BACKOFF
+                )
+        watch.due = time.monotonic() + self._jittered(watch.interval)
+
+        if new != watch.fingerprint and self._watches.get(watch.city) is watch:
+            watch.fingerprint = new
+            self.on_change(watch.city, data)
+
+    def _jittered(self, interval: float) -> float:
+        return interval * random.uniform(1 - self.jitter, 1 + self.jitter)
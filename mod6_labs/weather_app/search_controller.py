@@ -0,0 +1,46 @@
+# search_controller.py
+"""Latest-wins scheduling of search tasks."""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Optional
+
+
+class SearchController:
+    """
+    Run at most one search at a time, preferring the most recent request.
+
+    Each ``submit`` cancels the search that is still debouncing or waiting
+    for the network, then starts the new one after a short debounce delay.
+    Because older searches are cancelled rather than awaited, only the
+    result of the latest request is ever applied to the UI.
+
+    All methods must be called on the event loop (e.g. via
+    ``page.run_task``).
+    """
+
+    def __init__(self, debounce: float):
+        self.debounce = debounce
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def busy(self) -> bool:
+        """Whether a search is pending or running."""
+        return self._task is not None and not self._task.done()
+
+    async def submit(
+        self, handler: Callable[..., Awaitable[Any]], *args, **kwargs
+    ):
+        """Cancel any pending search and schedule ``handler(*args)``."""
+        self.cancel()
+        self._task = asyncio.create_task(self._run(handler, *args, **kwargs))
+
+    def cancel(self):
+        """Cancel the pending or running search, if any."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self._task = None
+
+    async def _run(self, handler, *args, **kwargs):
+        # Bursts of submits within the debounce window collapse into one
+        await asyncio.sleep(self.debounce)
+        await handler(*args, **kwargs)
@@ -0,0 +1,63 @@
+# singleflight.py
+"""Coalescing of concurrent identical requests."""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """
+    Share one in-flight task between concurrent callers with the same key.
+
+    The first caller for a key starts the task; later callers wait on the
+    same task until it finishes. Results and errors are delivered to every
+    waiter. Each waiter awaits through ``asyncio.shield`` so cancelling one
+    waiter never cancels the shared request.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._calls
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def start(
+        self, key: Hashable, factory: Callable[[], Awaitable[Any]]
+    ) -> asyncio.Task:
+        """
+        Return the in-flight task for a key, starting it if needed.
+
+        Args:
+            key: Normalized request key
+            factory: Called with no arguments to create the coroutine
+
+        Returns:
+            The shared task
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.create_task(factory())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+        return task
+
+    async def do(
+        self, key: Hashable, factory: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Run ``factory`` once per key and wait for the shared result."""
+        return await asyncio.shield(self.start(key, factory))
+
+    def cancel_all(self):
+        """Cancel every in-flight task."""
+        for task in list(self._calls.values()):
+            task.cancel()
+
+    def _finish(self, key: Hashable, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark the error as retrieved in case every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
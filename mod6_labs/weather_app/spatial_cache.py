@@ -0,0 +1,121 @@
+# spatial_cache.py
+"""Grid-hashed cache of weather observations keyed by coordinates."""
+
+import math
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+from cache import CacheStats
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = 111.32
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in kilometres."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lon2 - lon1)
+    a = (
+        math.sin(dphi / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+class GridCache:
+    """
+    Spatial cache that snaps coordinates to a fixed grid of cells.
+
+    Each cell holds at most one observation. A lookup scans only the cells
+    that can lie within ``max_distance_km`` of the query point and returns
+    the nearest observation younger than ``max_age``. Cells are evicted in
+    least-recently-used order once ``max_entries`` is reached.
+    """
+
+    def __init__(
+        self,
+        cell_size: float,
+        max_distance_km: float,
+        max_age: float,
+        max_entries: int,
+    ):
+        self.cell_size = cell_size
+        self.max_distance_km = max_distance_km
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self.stats = CacheStats()
+        self._lon_cells = round(360 / cell_size)
+        # (row, col) -> (lat, lon, stored_at, value)
+        self._cells: OrderedDict = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._cells)
+
+    def snap(self, lat: float, lon: float) -> Tuple[float, float]:
+        """Return the centre of the grid cell containing a point."""
+        row, col = self._cell(lat, lon)
+        return (
+            round((row + 0.5) * self.cell_size, 6),
+            round((col + 0.5) * self.cell_size - 180, 6),
+        )
+
+    def nearest(self, lat: float, lon: float) -> Optional[Any]:
+        """
+        Find the closest fresh observation within the distance bound.
+
+        Args:
+            lat: Latitude of the query point
+            lon: Longitude of the query point
+
+        Returns:
+            The cached value, or None if no cell qualifies
+        """
+        row, col = self._cell(lat, lon)
+        row_radius = math.ceil(
+            self.max_distance_km / (self.cell_size * KM_PER_DEGREE)
+        )
+        # Longitude cells shrink towards the poles, so scan more of them
+        lon_km = self.cell_size * KM_PER_DEGREE * max(
+            math.cos(math.radians(lat)), 0.01
+        )
+        col_radius = min(
+            math.ceil(self.max_distance_km / lon_km), self._lon_cells // 2
+        )
+
+        now = time.monotonic()
+        best_key, best_distance = None, self.max_distance_km
+        for r in range(row - row_radius, row + row_radius + 1):
+            for c in range(col - col_radius, col + col_radius + 1):
+                key = (r, c % self._lon_cells)
+                entry = self._cells.get(key)
+                if entry is None:
+                    continue
+                cell_lat, cell_lon, stored_at, _ = entry
+                if now - stored_at >= self.max_age:
+                    continue
+                distance = haversine_km(lat, lon, cell_lat, cell_lon)
+                if distance <= best_distance:
+                    best_key, best_distance = key, distance
+
+        if best_key is None:
+            self.stats.misses += 1
+            return None
+        self._cells.move_to_end(best_key)
+        self.stats.hits += 1
+        return self._cells[best_key][3]
+
+    def set(self, lat: float, lon: float, value: Any):
+        """Store an observation in the cell containing a point."""
+        key = self._cell(lat, lon)
+        self._cells[key] = (lat, lon, time.monotonic(), value)
+        self._cells.move_to_end(key)
+        while len(self._cells) > self.max_entries:
+            self._cells.popitem(last=False)
+            self.stats.evictions += 1
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        row = math.floor(lat / self.cell_size)
+        col = math.floor((lon + 180) / self.cell_size) % self._lon_cells
+        return row, col
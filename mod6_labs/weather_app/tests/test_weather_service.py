@@ -0,0 +1,76 @@
+# test_weather_service.py
+"""Tests for WeatherService.get_weather_many against a mocked API."""
+
+import asyncio
+import os
+import sys
+import unittest
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bench_service import StubWeatherServer  # noqa: E402
+from config import Config  # noqa: E402
+from weather_service import WeatherService  # noqa: E402
+
+
+def handler(request: httpx.Request) -> httpx.Response:
+    """Answers every lookup with the benchmark stub's payload."""
+    return httpx.Response(200, json=StubWeatherServer.payload(request.url.params["q"]))
+
+
+class GetWeatherManyTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        os.environ["OPENWEATHER_API_KEY"] = "test"
+        os.environ["OPENWEATHER_BASE_URL"] = "http://weather.test/data/2.5/weather"
+        Config.load()
+        # Stay in memory and offline
+        self._saved = {
+            name: getattr(Config, name)
+            for name in ("DISK_CACHE_PATH", "HISTORY_DIR", "ICON_PREFETCH")
+        }
+        Config.DISK_CACHE_PATH = ""
+        Config.HISTORY_DIR = ""
+        Config.ICON_PREFETCH = False
+        self.service = WeatherService(transport=httpx.MockTransport(handler))
+
+    async def asyncTearDown(self):
+        await self.service.aclose()
+
+    def tearDown(self):
+        for name, value in self._saved.items():
+            setattr(Config, name, value)
+
+    async def collect(self, cities, concurrency=3):
+        results = []
+        async for city, result in self.service.get_weather_many(cities, concurrency):
+            results.append((city, result))
+        return results
+
+    async def test_yields_every_city(self):
+        cities = [f"City {i}" for i in range(10)]
+        results = await asyncio.wait_for(self.collect(cities), timeout=5)
+        self.assertEqual(sorted(city for city, _ in results), sorted(cities))
+        self.assertTrue(all(result.city_id for _, result in results))
+
+    async def test_input_error_is_raised(self):
+        seen = []
+
+        def cities():
+            yield "London"
+            yield "Paris"
+            raise OSError("input went away")
+
+        async def run():
+            async for city, _ in self.service.get_weather_many(cities(), 3):
+                seen.append(city)
+
+        # Used to hang: the failing worker never signalled it was done
+        with self.assertRaisesRegex(OSError, "input went away"):
+            await asyncio.wait_for(run(), timeout=5)
+        self.assertEqual(sorted(seen), ["London", "Paris"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,42 @@
 # weather_service.py
 """Weather API service layer."""
 
+import asyncio
+import functools
+import importlib.util
+import logging
+import time
 import httpx
-from typing import Dict, Optional
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+from cache import CacheStats, TTLCache
+from city_index import CityIndex
 from config import Config
+from disk_cache import DISK_ERRORS, DiskCache
+from icon_cache import IconCache
+from metrics import HttpInstrumentation, Metrics
+from models import AirQuality, Forecast, WeatherSnapshot
+from resolver import LocationResolver, normalize_query
+from resilience import CircuitBreaker, RetryPolicy, TokenBucket
+from singleflight import SingleFlight
+from spatial_cache import GridCache
+
+if TYPE_CHECKING:
+    from history import HistoryStore  # needs NumPy
+
+logger = logging.getLogger(__name__)
 
 
 class WeatherServiceError(Exception):
@@ -11,29 +44,245 @@ class WeatherServiceError(Exception):
     pass
 
 
+class WeatherServiceConnectionError(WeatherServiceError):
+    """Raised when the API cannot be reached (timeout or network error)."""
+    pass
+
+
 class WeatherService:
-    """Service for fetching weather data from OpenWeatherMap API."""
+    """Service for fetching weather data from OpenWeatherMap API.
+
+    A single ``httpx.AsyncClient`` is kept for the lifetime of the service so
+    lookups reuse pooled keep-alive connections instead of paying a new
+    TCP + TLS handshake every time. Call ``aclose()`` (or use the service as
+    an async context manager) when the app shuts down.
+
+    Responses are kept in a TTL + LRU cache keyed by the normalized query
+    and units, so repeat lookups do not spend API quota. Coordinate lookups
+    are snapped to a grid and answered from the nearest cached cell. Concurrent
+    lookups for the same key share a single in-flight request. City names
+    are fetched by their canonical city ID once it is known: from the
+    offline CityIndex, or learned by a LocationResolver from the first
+    answer to a name query (and persisted). With Config.ICON_PREFETCH,
+    condition icons referenced by a new response are prefetched into a
+    local IconCache, which has its own client.
+
+    ``get_weather_sections`` fans out to the current weather, forecast and
+    air pollution endpoints at once, over the same client and cache.
+
+    Upstream calls are protected by a shared token-bucket rate limiter,
+    jittered retries (honouring Retry-After) and a circuit breaker that
+    fails fast while the API is down, which lets cached data be served.
+    With Config.METRICS_ENABLED, per-phase request timings, status codes,
+    response sizes, cache lookups, the breaker state and the rate
+    limiter's queue depth are recorded in ``self.metrics``.
+
+    Responses are parsed into compact WeatherSnapshot tuples as they
+    arrive; the raw JSON is not kept. The last snapshot per query is also
+    persisted to a DiskCache. It is served with ``stale=True`` when the API
+    cannot be reached, and lets the app show the last viewed city right
+    after startup. With NumPy installed, every fresh snapshot is also
+    added to a per-city HistoryStore (``self.history``) for charts and
+    statistics.
+    """
     
-    def __init__(self):
+    def __init__(
+        self,
+        limits: Optional[httpx.Limits] = None,
+        http2: Optional[bool] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        cache: Optional[TTLCache] = None,
+        disk_cache: Optional[DiskCache] = None,
+        grid_cache: Optional[GridCache] = None,
+        city_index: Optional[CityIndex] = None,
+        resolver: Optional[LocationResolver] = None,
+        icons: Optional[IconCache] = None,
+        retry: Optional[RetryPolicy] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        rate_limiter: Optional[TokenBucket] = None,
+        history: Optional["HistoryStore"] = None,
+        metrics: Optional[Metrics] = None,
+    ):
+        Config.validate()
         self.api_key = Config.API_KEY
         self.base_url = Config.BASE_URL
+        self.forecast_url = Config.FORECAST_URL
+        self.air_quality_url = Config.AIR_QUALITY_URL
         self.timeout = Config.TIMEOUT
-    
-    async def get_weather(self, city: str) -> Dict:
+        self.limits = limits or httpx.Limits(
+            max_connections=Config.MAX_CONNECTIONS,
+            max_keepalive_connections=Config.MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=Config.KEEPALIVE_EXPIRY,
+        )
+        # HTTP/2 needs the optional "h2" package; fall back to HTTP/1.1
+        self.http2 = (Config.HTTP2 if http2 is None else http2) and (
+            importlib.util.find_spec("h2") is not None
+        )
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+
+        # Instrumentation is off unless enabled; when off, no hooks are
+        # installed and the hot path only checks ``self.metrics is None``
+        if metrics is None and Config.METRICS_ENABLED:
+            metrics = Metrics()
+        self.metrics = metrics
+
+        if cache is None:
+            cache = TTLCache(
+                ttl=Config.CACHE_TTL,
+                max_entries=Config.CACHE_MAX_ENTRIES,
+                stale_ttl=(
+                    Config.CACHE_STALE_TTL
+                    if Config.CACHE_STALE_WHILE_REVALIDATE
+                    else 0
+                ),
+            )
+        self.cache = cache
+
+        if grid_cache is None:
+            grid_cache = GridCache(
+                cell_size=Config.COORD_GRID_SIZE,
+                max_distance_km=Config.COORD_MAX_DISTANCE_KM,
+                max_age=Config.COORD_MAX_AGE,
+                max_entries=Config.COORD_CACHE_MAX_ENTRIES,
+            )
+        self.grid_cache = grid_cache
+
+        if city_index is None:
+            city_index = CityIndex(Config.CITY_LIST_PATH)
+        self.city_index = city_index
+
+        if icons is None:
+            icons = IconCache(
+                Config.ICON_CACHE_DIR,
+                Config.ICON_ASSET_PREFIX,
+                Config.ICON_CACHE_MAX_FILES,
+                timeout=self.timeout,
+            )
+        self.icons = icons
+
+        self.retry = retry or RetryPolicy(
+            attempts=Config.RETRY_ATTEMPTS,
+            base_delay=Config.RETRY_BASE_DELAY,
+            max_delay=Config.RETRY_MAX_DELAY,
+        )
+        self.breaker = breaker or CircuitBreaker(
+            failure_threshold=Config.BREAKER_FAILURE_THRESHOLD,
+            reset_timeout=Config.BREAKER_RESET_TIMEOUT,
+        )
+        self.rate_limiter = rate_limiter or TokenBucket(
+            rate_per_minute=Config.RATE_LIMIT_PER_MINUTE,
+            burst=Config.RATE_LIMIT_BURST,
+        )
+        self.retries = 0  # retried attempts, for monitoring
+        if self.metrics is not None:
+            self._register_resilience_metrics()
+
+        if disk_cache is None and Config.DISK_CACHE_PATH:
+            disk_cache = DiskCache(
+                Config.DISK_CACHE_PATH,
+                flush_interval=Config.DISK_CACHE_FLUSH_INTERVAL,
+                max_entries=Config.DISK_CACHE_MAX_ENTRIES,
+                max_locations=Config.RESOLVER_MAX_ENTRIES,
+            )
+        self.disk_cache = disk_cache
+
+        if resolver is None:
+            resolver = LocationResolver(
+                self.city_index, Config.RESOLVER_MAX_ENTRIES, disk_cache
+            )
+        self.resolver = resolver
+
+        # Observation history needs the optional NumPy dependency
+        if (
+            history is None
+            and Config.HISTORY_DIR
+            and importlib.util.find_spec("numpy") is not None
+        ):
+            from history import HistoryStore
+
+            history = HistoryStore(
+                Config.HISTORY_DIR,
+                capacity=Config.HISTORY_CAPACITY,
+                max_cities=Config.HISTORY_MAX_CITIES,
+                units=Config.UNITS,
+                flush_interval=Config.HISTORY_FLUSH_INTERVAL,
+            )
+        self.history = history
+        # In-flight fetches (including background revalidation), by cache key
+        self._inflight = SingleFlight()
+
+    # ---------------------------------------------------------
+    # CLIENT LIFECYCLE
+    # ---------------------------------------------------------
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared HTTP client, created on first use."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=self.limits,
+                http2=self.http2,
+                transport=self._transport,
+                event_hooks=(
+                    HttpInstrumentation(self.metrics).event_hooks
+                    if self.metrics is not None
+                    else None
+                ),
+            )
+        return self._client
+
+    async def aclose(self):
+        """Close the shared HTTP client and its pooled connections."""
+        self._inflight.cancel_all()
+        await self.icons.aclose()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self.disk_cache is not None:
+            await self.disk_cache.aclose()
+        if self.history is not None:
+            await self.history.aclose()
+
+    async def __aenter__(self) -> "WeatherService":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+    @property
+    def cache_stats(self) -> CacheStats:
+        """Hit, miss and eviction counters of the response cache."""
+        return self.cache.stats
+
+    # ---------------------------------------------------------
+    # PUBLIC API
+    # ---------------------------------------------------------
+    async def get_weather(
+        self, city: str, refresh: bool = False
+    ) -> WeatherSnapshot:
         """
         Fetch weather data for a given city.
         
         Args:
             city: Name of the city
+            refresh: Skip the response cache and fetch current data
             
         Returns:
-            Dictionary containing weather data
+            WeatherSnapshot of current conditions
             
         Raises:
             WeatherServiceError: If the request fails
         """
+        city = city.strip() if city else ""
         if not city:
             raise WeatherServiceError("City name cannot be empty")
+
+        # Known names go straight to the canonical ID
+        await self.resolver.load()
+        entry = self.resolver.resolve(city)
+        if entry is not None:
+            return await self.get_weather_by_id(entry.id, refresh)
         
         # Build request parameters
         params = {
@@ -42,62 +291,71 @@ class WeatherService:
             "units": Config.UNITS,
         }
         
-        try:
-            # Make async HTTP request
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(self.base_url, params=params)
-                
-                # Check for HTTP errors
-                if response.status_code == 404:
-                    raise WeatherServiceError(
-                        f"City '{city}' not found. Please check the spelling."
-                    )
-                elif response.status_code == 401:
-                    raise WeatherServiceError(
-                        "Invalid API key. Please check your configuration."
-                    )
-                elif response.status_code >= 500:
-                    raise WeatherServiceError(
-                        "Weather service is currently unavailable. "
-                        "Please try again later."
-                    )
-                elif response.status_code != 200:
-                    raise WeatherServiceError(
-                        f"Error fetching weather data: {response.status_code}"
-                    )
-                
-                # Parse JSON response
-                data = response.json()
-                return data
-                
-        except httpx.TimeoutException:
-            raise WeatherServiceError(
-                "Request timed out. Please check your internet connection."
-            )
-        except httpx.NetworkError:
-            raise WeatherServiceError(
-                "Network error. Please check your internet connection."
-            )
-        except httpx.HTTPError as e:
-            raise WeatherServiceError(f"HTTP error occurred: {str(e)}")
-        except Exception as e:
-            raise WeatherServiceError(f"An unexpected error occurred: {str(e)}")
+        return await self._cached_fetch(
+            self._city_key(city),
+            params,
+            f"City '{city}' not found. Please check the spelling.",
+            refresh,
+        )
     
+    async def get_weather_by_id(
+        self, city_id: int, refresh: bool = False
+    ) -> WeatherSnapshot:
+        """
+        Fetch weather data by OpenWeatherMap city ID.
+
+        Args:
+            city_id: Canonical city ID (see CityIndex)
+            refresh: Skip the response cache and fetch current data
+
+        Returns:
+            WeatherSnapshot of current conditions
+
+        Raises:
+            WeatherServiceError: If the request fails
+        """
+        params = {
+            "id": city_id,
+            "appid": self.api_key,
+            "units": Config.UNITS,
+        }
+
+        return await self._cached_fetch(
+            ("id", city_id, Config.UNITS),
+            params,
+            f"City ID {city_id} not found.",
+            refresh,
+        )
+
     async def get_weather_by_coordinates(
         self, 
         lat: float, 
         lon: float
-    ) -> Dict:
+    ) -> WeatherSnapshot:
         """
         Fetch weather data by coordinates.
+
+        The point is answered from the nearest cached grid cell within
+        Config.COORD_MAX_DISTANCE_KM if one is fresh enough. Otherwise the
+        request is sent for the centre of the point's grid cell, so nearby
+        points share one request and one cache entry.
         
         Args:
             lat: Latitude
             lon: Longitude
             
         Returns:
-            Dictionary containing weather data
+            WeatherSnapshot of current conditions
+
+        Raises:
+            WeatherServiceError: If the request fails
         """
+        data = self.grid_cache.nearest(lat, lon)
+        self._count_lookup("hit" if data is not None else "miss")
+        if data is not None:
+            return data
+
+        lat, lon = self.grid_cache.snap(lat, lon)
         params = {
             "lat": lat,
             "lon": lon,
@@ -105,11 +363,534 @@ class WeatherService:
             "units": Config.UNITS,
         }
         
+        key = ("coord", lat, lon, Config.UNITS)
+        return await self._inflight.do(
+            key,
+            functools.partial(
+                self._fetch_and_store,
+                key,
+                params,
+                f"No weather data found for coordinates ({lat}, {lon}).",
+            ),
+        )
+
+    async def load_city_index(self) -> bool:
+        """
+        Load the offline city index on a worker thread.
+
+        Returns:
+            True if the index is ready, False if no gazetteer is installed
+        """
+        if not self.city_index.available:
+            return False
+        await asyncio.to_thread(self.city_index.load)
+        return True
+
+    def remember_last_viewed(self, city: str):
+        """Record the city shown to the user so it can be restored later."""
+        if self.disk_cache is None:
+            return
+        city = city.strip()
+        entry = self.resolver.resolve(city)
+        key = (
+            ("id", entry.id, Config.UNITS)
+            if entry is not None
+            else self._city_key(city)
+        )
+        self.disk_cache.set_meta("last_city", city)
+        self.disk_cache.set_meta("last_key", self._disk_key(key))
+
+    async def load_last_viewed(
+        self,
+    ) -> Optional[Tuple[str, WeatherSnapshot]]:
+        """
+        Load the last viewed city and its data from the disk cache.
+
+        Returns:
+            Tuple of (city, stale snapshot), or None if nothing is stored
+        """
+        if self.disk_cache is None:
+            return None
+        try:
+            city = await self.disk_cache.get_meta("last_city")
+            disk_key = await self.disk_cache.get_meta("last_key")
+        except DISK_ERRORS as e:
+            logger.warning("Last viewed city not loaded: %s", e)
+            return None
+        if not city or not disk_key:
+            return None
+        data = await self._load_from_disk(disk_key)
+        return (city, data) if data is not None else None
+
+    async def get_forecast(self, city: str) -> Forecast:
+        """
+        Fetch the 5-day / 3-hour forecast for a city.
+
+        Args:
+            city: Name of the city
+
+        Returns:
+            Forecast with its 3-hour entries
+
+        Raises:
+            WeatherServiceError: If the request fails
+        """
+        city = city.strip() if city else ""
+        if not city:
+            raise WeatherServiceError("City name cannot be empty")
+
+        await self.resolver.load()
+        entry = self.resolver.resolve(city)
+        query = {"id": entry.id} if entry is not None else {"q": city}
+        return await self._cached_section(
+            self.forecast_url,
+            Forecast.from_payload,
+            query,
+            f"No forecast found for '{city}'.",
+        )
+
+    async def get_air_quality(self, lat: float, lon: float) -> AirQuality:
+        """
+        Fetch current air pollution at a location.
+
+        The point is snapped to the coordinate grid (see
+        get_weather_by_coordinates), so nearby lookups share a cache entry.
+
+        Returns:
+            AirQuality with the AQI and main pollutant concentrations
+
+        Raises:
+            WeatherServiceError: If the request fails
+        """
+        lat, lon = self.grid_cache.snap(lat, lon)
+        return await self._cached_section(
+            self.air_quality_url,
+            AirQuality.from_payload,
+            {"lat": lat, "lon": lon},
+            f"No air quality data for ({lat}, {lon}).",
+        )
+
+    async def get_weather_sections(
+        self, city: str
+    ) -> AsyncIterator[Tuple[str, Union[Any, WeatherServiceError]]]:
+        """
+        Fetch current conditions, forecast and air quality in parallel.
+
+        Sections are yielded as soon as each arrives, so a slow forecast
+        never holds back the current conditions. The current-weather
+        request is started first. Air quality needs coordinates: if the
+        LocationResolver knows the city it starts right away, otherwise
+        it follows the current-weather response. A failed section yields
+        its error; the others still arrive.
+
+        Args:
+            city: Name of the city
+
+        Yields:
+            Tuples of (section, result): ("current", WeatherSnapshot),
+            ("forecast", Forecast) and ("air", AirQuality), each result
+            possibly a WeatherServiceError instead
+        """
+        await self.resolver.load()
+        entry = self.resolver.resolve(city.strip()) if city else None
+        results: asyncio.Queue = asyncio.Queue()
+        current = asyncio.ensure_future(self.get_weather(city))
+
+        async def air_quality() -> AirQuality:
+            if entry is not None:
+                return await self.get_air_quality(entry.lat, entry.lon)
+            try:
+                snapshot = await asyncio.shield(current)
+            except WeatherServiceError:
+                raise WeatherServiceError(
+                    "Air quality is unavailable without a location."
+                )
+            return await self.get_air_quality(snapshot.lat, snapshot.lon)
+
+        async def report(section: str, awaitable: Awaitable):
+            try:
+                result = await awaitable
+            except WeatherServiceError as e:
+                result = e
+            except Exception as e:
+                result = WeatherServiceError(
+                    f"An unexpected error occurred: {str(e)}"
+                )
+            results.put_nowait((section, result))
+
+        tasks = [
+            asyncio.ensure_future(report("current", asyncio.shield(current))),
+            asyncio.ensure_future(report("forecast", self.get_forecast(city))),
+            asyncio.ensure_future(report("air", air_quality())),
+        ]
+        try:
+            for _ in tasks:
+                yield await results.get()
+        finally:
+            for task in (current, *tasks):
+                task.cancel()
+
+    async def get_weather_many(
+        self,
+        cities: Iterable[Union[str, Tuple[float, float]]],
+        concurrency: Optional[int] = None,
+        on_progress: Optional[Callable[[int, Optional[int]], None]] = None,
+    ) -> AsyncIterator[
+        Tuple[
+            Union[str, Tuple[float, float]],
+            Union[WeatherSnapshot, WeatherServiceError],
+        ]
+    ]:
+        """
+        Fetch weather for many places concurrently, in completion order.
+
+        A fixed pool of workers pulls places from the iterable, so at most
+        ``concurrency`` requests are in flight and only a bounded number of
+        results are buffered, however long the input is. All workers share
+        the service's HTTP client and cache. A failing place yields its
+        error instead of aborting the batch; an error raised by the
+        iterable itself ends the batch and is raised after the places
+        already taken from it are yielded.
+
+        Args:
+            cities: City names and/or (lat, lon) tuples to look up
+            concurrency: Maximum parallel lookups (defaults to
+                Config.BATCH_CONCURRENCY)
+            on_progress: Called with (completed, total) after each result;
+                total is None when the input has no length
+
+        Yields:
+            Tuples of (the input item, WeatherSnapshot or WeatherServiceError)
+        """
+        concurrency = max(1, concurrency or Config.BATCH_CONCURRENCY)
+        total = len(cities) if hasattr(cities, "__len__") else None
+        pending = iter(cities)
+        results: asyncio.Queue = asyncio.Queue(maxsize=concurrency)
+        input_errors: List[Exception] = []
+
+        async def worker():
+            # Workers share one iterator, so each item is fetched once
+            try:
+                for city in pending:
+                    try:
+                        if isinstance(city, tuple):
+                            result = await self.get_weather_by_coordinates(*city)
+                        else:
+                            result = await self.get_weather(city)
+                    except WeatherServiceError as e:
+                        result = e
+                    except Exception as e:
+                        result = WeatherServiceError(
+                            f"An unexpected error occurred: {str(e)}"
+                        )
+                    await results.put((city, result))
+            except Exception as e:
+                # Reading the input failed; raised once the others finish
+                input_errors.append(e)
+            await results.put(None)
+
+        workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+        completed = 0
+        try:
+            running = len(workers)
+            while running:
+                item = await results.get()
+                if item is None:
+                    running -= 1
+                    continue
+                completed += 1
+                if on_progress is not None:
+                    on_progress(completed, total)
+                yield item
+            if input_errors:
+                raise input_errors[0]
+        finally:
+            for task in workers:
+                task.cancel()
+
+    # ---------------------------------------------------------
+    # CACHE
+    # ---------------------------------------------------------
+    async def _cached_fetch(
+        self,
+        key: Hashable,
+        params: Dict,
+        not_found_message: str,
+        refresh: bool = False,
+    ) -> WeatherSnapshot:
+        """
+        Serve a request from the cache, fetching it on a miss.
+
+        A stale entry is returned right away while a background task
+        refreshes it (stale-while-revalidate). Concurrent misses for the
+        same key wait on one shared fetch. With ``refresh`` the cache is
+        skipped (but an in-flight fetch for the key is still shared).
+        """
+        fetch = functools.partial(
+            self._fetch_and_store, key, params, not_found_message
+        )
+        return await self._serve_cached(key, fetch, refresh)
+
+    async def _cached_section(
+        self,
+        url: str,
+        parse: Callable[[Dict, float], Any],
+        query: Dict,
+        not_found_message: str,
+    ) -> Any:
+        """Serve a forecast or air quality request through the same cache."""
+        key = (url, *sorted(query.items()), Config.UNITS)
+        params = {**query, "appid": self.api_key, "units": Config.UNITS}
+
+        async def fetch():
+            data = await self._fetch(params, not_found_message, url)
+            result = parse(data, time.time())
+            self.cache.set(key, result)
+            return result
+
+        return await self._serve_cached(key, fetch)
+
+    async def _serve_cached(
+        self,
+        key: Hashable,
+        fetch: Callable[[], Awaitable[Any]],
+        refresh: bool = False,
+    ) -> Any:
+        if refresh:
+            self._count_lookup("refresh")
+            return await self._inflight.do(key, fetch)
+
+        data, fresh = self.cache.get(key)
+        if data is not None:
+            self._count_lookup("hit" if fresh else "stale")
+            if not fresh:
+                self._inflight.start(key, fetch)
+            return data
+
+        self._count_lookup("miss")
+        return await self._inflight.do(key, fetch)
+
+    def _count_lookup(self, result: str):
+        if self.metrics is not None:
+            self.metrics.inc("cache_lookups_total", result=result)
+
+    async def _fetch_and_store(
+        self, key: Hashable, params: Dict, not_found_message: str
+    ) -> WeatherSnapshot:
+        """
+        Fetch a response and store it in the memory and disk caches.
+
+        If the API cannot be reached, the last snapshot stored on disk is
+        returned instead, marked stale.
+        """
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(self.base_url, params=params)
-                response.raise_for_status()
+            data = await self._fetch(params, not_found_message)
+        except WeatherServiceConnectionError:
+            cached = await self._load_from_disk(self._disk_key(key))
+            if cached is None:
+                raise
+            return cached
+
+        snapshot = WeatherSnapshot.from_payload(data, time.time())
+        if key[0] == "q" and snapshot.city_id:
+            # From now on this name (in any spelling) is fetched by ID, so
+            # it is stored only under the ID key. Learned before any await,
+            # so no lookup sees the name unknown and the ID key filled.
+            self.resolver.learn(params["q"], snapshot)
+            key = ("id", snapshot.city_id, Config.UNITS)
+        if key[0] == "coord":
+            self.grid_cache.set(key[1], key[2], snapshot)
+        else:
+            self.cache.set(key, snapshot)
+        if self.disk_cache is not None:
+            self.disk_cache.put(
+                self._disk_key(key), snapshot.to_row(), snapshot.fetched_at
+            )
+        if self.history is not None:
+            self.history.record(snapshot)
+
+        # Fetch the icons this result will render before the UI asks
+        if Config.ICON_PREFETCH:
+            self.icons.prefetch(IconCache.likely_codes(snapshot.icon))
+        return snapshot
+
+    async def _load_from_disk(
+        self, disk_key: str
+    ) -> Optional[WeatherSnapshot]:
+        """
+        Return the snapshot stored on disk for a key, marked stale.
+
+        An unreadable disk cache is logged and treated as a miss.
+        """
+        if self.disk_cache is None:
+            return None
+        try:
+            entry = await self.disk_cache.get(disk_key)
+        except DISK_ERRORS as e:
+            logger.warning("Disk cache read of %s failed: %s", disk_key, e)
+            return None
+        if entry is None:
+            return None
+        row, fetched_at = entry
+        snapshot = WeatherSnapshot.from_row(row, fetched_at)
+        return snapshot._replace(stale=True) if snapshot else None
+
+    @staticmethod
+    def _city_key(city: str) -> Hashable:
+        """Cache key for a city query (normalized, with units)."""
+        return ("q", normalize_query(city), Config.UNITS)
+
+    @staticmethod
+    def _disk_key(key: Hashable) -> str:
+        return "|".join(str(part) for part in key)
+
+    # ---------------------------------------------------------
+    # HTTP
+    # ---------------------------------------------------------
+    async def _fetch(
+        self, params: Dict, not_found_message: str, url: Optional[str] = None
+    ) -> Dict:
+        """
+        Send a GET request over the shared client and parse the response.
+
+        Args:
+            params: Query parameters for the request
+            not_found_message: Error message to use for a 404 response
+            url: Endpoint to call (defaults to current weather)
+
+        Returns:
+            Dictionary containing the raw response JSON
+
+        Raises:
+            WeatherServiceError: If the request fails
+        """
+        try:
+            # Make async HTTP request (rate limited, retried)
+            response = await self._send(params, url or self.base_url)
+            
+            # Check for HTTP errors
+            if response.status_code == 404:
+                raise WeatherServiceError(not_found_message)
+            elif response.status_code == 401:
+                raise WeatherServiceError(
+                    "Invalid API key. Please check your configuration."
+                )
+            elif response.status_code == 429:
+                raise WeatherServiceError(
+                    "Too many requests. Please try again in a minute."
+                )
+            elif response.status_code >= 500:
+                raise WeatherServiceConnectionError(
+                    "Weather service is currently unavailable. "
+                    "Please try again later."
+                )
+            elif response.status_code != 200:
+                raise WeatherServiceError(
+                    f"Error fetching weather data: {response.status_code}"
+                )
+            
+            # Parse JSON response
+            if self.metrics is None:
                 return response.json()
+            started = time.perf_counter()
+            data = response.json()
+            self.metrics.observe("parse_seconds", time.perf_counter() - started)
+            return data
                 
+        except WeatherServiceError:
+            raise
+        except httpx.TimeoutException:
+            raise WeatherServiceConnectionError(
+                "Request timed out. Please check your internet connection."
+            )
+        except httpx.NetworkError:
+            raise WeatherServiceConnectionError(
+                "Network error. Please check your internet connection."
+            )
+        except httpx.HTTPError as e:
+            raise WeatherServiceError(f"HTTP error occurred: {str(e)}")
         except Exception as e:
-            raise WeatherServiceError(f"Error fetching weather data: {str(e)}")
\ No newline at end of file
+            raise WeatherServiceError(f"An unexpected error occurred: {str(e)}")
+
+    def _register_resilience_metrics(self):
+        """Export the breaker state and rate-limiter queue in self.metrics."""
+        for state in (
+            CircuitBreaker.CLOSED,
+            CircuitBreaker.HALF_OPEN,
+            CircuitBreaker.OPEN,
+        ):
+            # 1 for the current state, 0 for the others
+            self.metrics.register_gauge(
+                "circuit_breaker_state",
+                lambda state=state: float(self.breaker.state == state),
+                state=state,
+            )
+        self.breaker.listeners.append(
+            lambda old_state, state: self.metrics.inc(
+                "circuit_breaker_transitions_total", to=state
+            )
+        )
+        self.metrics.register_gauge(
+            "rate_limiter_queue_depth", lambda: self.rate_limiter.queue_depth
+        )
+
+    async def _send(self, params: Dict, url: str) -> httpx.Response:
+        """
+        Send a GET with rate limiting, retries and the circuit breaker.
+
+        Timeouts, network errors, 429 and 5xx responses are retried with
+        jittered exponential backoff. The final response (or transport
+        error) is returned to ``_fetch`` for error mapping. Every outcome
+        is reported to the breaker: 5xx and errors as failures, other
+        responses (429 included) as successes.
+
+        Raises:
+            WeatherServiceConnectionError: If the circuit is open
+        """
+        if not self.breaker.allow():
+            raise WeatherServiceConnectionError(
+                "Weather service is temporarily unavailable. "
+                "Please try again later."
+            )
+
+        # The final outcome always reaches the breaker, or a half-open
+        # breaker would wait for a trial that never reports back
+        failed: Optional[bool] = True
+        try:
+            for attempt in range(self.retry.attempts):
+                failed = True
+                await self.rate_limiter.acquire()
+                retry_after = None
+                try:
+                    response = await self.client.get(url, params=params)
+                except (httpx.TimeoutException, httpx.NetworkError):
+                    if attempt == self.retry.attempts - 1:
+                        raise
+                else:
+                    # A 429 is our quota, not an upstream outage
+                    failed = response.status_code >= 500
+                    if response.status_code != 429 and not failed:
+                        return response
+                    retry_after = RetryPolicy.parse_retry_after(
+                        response.headers.get("Retry-After")
+                    )
+                    last_attempt = attempt == self.retry.attempts - 1
+                    too_long = (
+                        retry_after is not None
+                        and retry_after > self.retry.max_delay
+                    )
+                    if last_attempt or too_long:
+                        return response
+
+                self.retries += 1
+                await asyncio.sleep(self.retry.delay(attempt, retry_after))
+        except asyncio.CancelledError:
+            failed = None  # abandoned, neither a success nor a failure
+            raise
+        finally:
+            if failed is None:
+                self.breaker.release()
+            elif failed:
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
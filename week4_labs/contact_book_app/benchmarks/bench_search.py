@@ -0,0 +1,139 @@
+# bench_search.py
+"""Benchmark contact search: FTS5 index vs the LIKE table scan.
+
+Builds throwaway address books of the requested sizes in a temporary
+directory (the app's contacts.db is never touched), then times:
+
+  backfill   one-time upgrade of an existing database by init_db: schema
+             migrations (sort key backfill) and the FTS5 'rebuild'
+  like_all   get_all_contacts_db: name LIKE '%term%', every match
+  fts_page   search_contacts_db: one ranked page with highlights
+  fts_all    search_contacts_db: every match, ranked
+
+for a set of search terms, including the prefixes typed on the way to a
+full name. Times are medians in milliseconds. The report is JSON on stdout.
+
+Usage:
+    python benchmarks/bench_search.py [--rows 100000 1000000] [--repeat 5]
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from database import get_all_contacts_db, init_db, search_contacts_db  # noqa: E402
+
+FIRST_NAMES = [
+    "Anna", "Ben", "Carla", "David", "Elena", "Farid", "Grace", "Hiro",
+    "Isabel", "Jonas", "Kofi", "Lena", "Marco", "Nadia", "Oscar", "Priya",
+    "Quinn", "Rosa", "Sami", "Tomas", "Uma", "Victor", "Wen", "Yusuf", "Zoe",
+]
+LAST_NAMES = [
+    "Smith", "Garcia", "Nguyen", "Okafor", "Rossi", "Schmidt", "Tanaka",
+    "Kowalski", "Dubois", "Silva", "Haddad", "Johansson", "Novak", "Reyes",
+    "Fischer", "Moreau", "Santos", "Ivanova", "Kim", "Murphy",
+]
+DOMAINS = ["example.com", "mail.org", "post.net", "inbox.io"]
+
+# Prefixes typed on the way to "Smith", then other kinds of queries
+TERMS = ["s", "sm", "smi", "smit", "smith", "anna smith", "555 12", "inbox", "zzz"]
+
+
+def build_contacts(path: str, rows: int, seed: int = 0, create: bool = True):
+    """
+    Writes a contacts table of random people, as an older app version would.
+    With create=False, adds them to the existing contacts table instead.
+    """
+    rng = random.Random(seed)
+    conn = sqlite3.connect(path)
+    if create:
+        conn.execute(
+            """
+            CREATE TABLE contacts (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                phone TEXT,
+                email TEXT
+            )
+            """
+        )
+
+    def people():
+        for i in range(rows):
+            first = rng.choice(FIRST_NAMES)
+            last = rng.choice(LAST_NAMES)
+            yield (
+                f"{first} {last}",
+                f"555-{rng.randrange(10000):04d}",
+                f"{first.lower()}.{last.lower()}{i}@{rng.choice(DOMAINS)}",
+            )
+
+    with conn:
+        conn.executemany(
+            "INSERT INTO contacts (name, phone, email) VALUES (?, ?, ?)", people()
+        )
+    conn.close()
+
+
+def median_ms(fn, repeat: int) -> float:
+    """Median wall time of fn() over repeat runs, in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def run_size(directory: str, rows: int, repeat: int) -> dict:
+    path = os.path.join(directory, f"contacts_{rows}.db")
+    build_contacts(path, rows)
+
+    started = time.perf_counter()
+    conn = init_db(path)
+    backfill_ms = (time.perf_counter() - started) * 1000
+
+    terms = {}
+    for term in TERMS:
+        like_matches = len(get_all_contacts_db(conn, term))
+        fts_matches = len(search_contacts_db(conn, term, limit=rows)[0])
+        terms[term] = {
+            "like_matches": like_matches,
+            "fts_matches": fts_matches,
+            "like_all_ms": median_ms(lambda: get_all_contacts_db(conn, term), repeat),
+            "fts_page_ms": median_ms(lambda: search_contacts_db(conn, term), repeat),
+            "fts_all_ms": median_ms(
+                lambda: search_contacts_db(conn, term, limit=rows), repeat
+            ),
+        }
+    conn.close()
+
+    return {
+        "rows": rows,
+        "db_bytes": os.path.getsize(path),
+        "backfill_ms": backfill_ms,
+        "terms": terms,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        report = [run_size(directory, rows, args.repeat) for rows in args.rows]
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
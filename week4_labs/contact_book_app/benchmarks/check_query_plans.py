@@ -0,0 +1,201 @@
+# check_query_plans.py
+"""Check the query plans of the contact queries after each schema migration.
+
+Builds a throwaway address book as a build from before schema versioning
+left it (contacts table, name index and full-text index, user_version 0),
+in a temporary directory; the app's contacts.db is never touched. It then
+applies the migrations in database.MIGRATIONS one at a time and, after
+each, runs EXPLAIN QUERY PLAN on the app's queries and asserts what every
+plan from that version on must (and must not) contain, plus the data
+checks for the migration itself. A fresh database from init_db gets the
+same plan checks.
+
+Exits with status 1 if any check fails, so a migration or query change
+that loses an index shows up as a failure rather than a slow list.
+
+Usage:
+    python benchmarks/check_query_plans.py [--rows 5000]
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from bench_search import build_contacts  # noqa: E402
+from database import (  # noqa: E402
+    MIGRATIONS,
+    contacts_page_sql,
+    has_fts,
+    init_db,
+    init_fts,
+    migrate,
+    schema_version,
+    search_contacts_sql,
+    sort_key,
+)
+
+SORT_INDEX = "COVERING INDEX idx_contacts_sort"
+BY_ID = "USING INTEGER PRIMARY KEY (rowid=?)"
+SORTS = "USE TEMP B-TREE"
+
+# (since version, label, (sql, params), must contain, must not contain)
+PLAN_CHECKS = [
+    (
+        1,
+        "update by id",
+        (
+            "UPDATE contacts SET name = ?, phone = ?, email = ? WHERE id = ?",
+            ("Anna", "555", "anna@example.com", 1),
+        ),
+        [BY_ID],
+        ["SCAN"],
+    ),
+    (1, "delete by id", ("DELETE FROM contacts WHERE id = ?", (1,)), [BY_ID], ["SCAN"]),
+    (3, "first page", contacts_page_sql(), [f"SCAN contacts USING {SORT_INDEX}"], [SORTS]),
+    (
+        3,
+        "next page",
+        contacts_page_sql(after=("anna smith", 42)),
+        [f"SEARCH contacts USING {SORT_INDEX} (sort_key>?)"],
+        [SORTS],
+    ),
+    (
+        3,
+        "LIKE first page",
+        contacts_page_sql("smi"),
+        [f"SCAN contacts USING {SORT_INDEX}"],
+        [SORTS],
+    ),
+    (
+        3,
+        "LIKE next page",
+        contacts_page_sql("smi", ("anna smith", 42)),
+        [f"SEARCH contacts USING {SORT_INDEX} (sort_key>?)"],
+        [SORTS],
+    ),
+]
+
+# Only checked when SQLite has FTS5
+FTS_PLAN_CHECKS = [
+    (
+        1,
+        "search",
+        search_contacts_sql("ann 555"),
+        ["VIRTUAL TABLE INDEX", f"SEARCH c {BY_ID}"],
+        ["SCAN c"],
+    ),
+    (
+        1,
+        "search next page",
+        search_contacts_sql("ann", (-1.5, 42)),
+        ["VIRTUAL TABLE INDEX", f"SEARCH c {BY_ID}"],
+        ["SCAN c"],
+    ),
+]
+
+
+def query_plan(conn, sql: str, params) -> str:
+    """The EXPLAIN QUERY PLAN details of a query, one step per line."""
+    rows = conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+    return "\n".join(row[3] for row in rows)
+
+
+def check_plans(conn, version: int, failures: list, label: str):
+    checks = PLAN_CHECKS + (FTS_PLAN_CHECKS if has_fts(conn) else [])
+    for since, name, (sql, params), required, forbidden in checks:
+        if version < since:
+            continue
+        plan = query_plan(conn, sql, params)
+        missing = [text for text in required if text not in plan]
+        present = [text for text in forbidden if text in plan]
+        status = "ok" if not (missing or present) else "FAIL"
+        print(f"{status:4} {label} v{version} {name}: {plan!r}")
+        if missing or present:
+            failures.append(f"{label} v{version} {name}: missing {missing}, has {present}")
+
+
+def check_migration(conn, version: int, failures: list):
+    """Data checks for the migration that brought the database to version."""
+
+    def expect(ok: bool, what: str):
+        print(f"{'ok' if ok else 'FAIL':4} upgrade v{version} {what}")
+        if not ok:
+            failures.append(f"upgrade v{version} {what}")
+
+    if version == 2:
+        stale = sum(
+            key != sort_key(name)
+            for name, key in conn.execute("SELECT name, sort_key FROM contacts")
+        )
+        expect(stale == 0, "backfilled every sort_key")
+        conn.execute("INSERT INTO contacts (name) VALUES ('Written By An Old Build')")
+        key = conn.execute(
+            "SELECT sort_key FROM contacts WHERE id = last_insert_rowid()"
+        ).fetchone()[0]
+        conn.rollback()
+        expect(key == "written by an old build", "defaults sort_key on insert")
+        if has_fts(conn):
+            try:
+                conn.execute(
+                    "INSERT INTO contacts_fts (contacts_fts) VALUES ('integrity-check')"
+                )
+                in_sync = True
+            except sqlite3.DatabaseError:
+                in_sync = False
+            conn.rollback()
+            expect(in_sync, "full-text index still in sync")
+    if version == 3:
+        names = {row[1] for row in conn.execute("PRAGMA index_list(contacts)")}
+        expect("idx_contacts_name" not in names, "dropped idx_contacts_name")
+
+
+def check_legacy_upgrade(directory: str, rows: int, failures: list):
+    path = os.path.join(directory, "legacy.db")
+    build_contacts(path, rows)
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE INDEX idx_contacts_name ON contacts (name COLLATE NOCASE, id)")
+    conn.commit()
+    init_fts(conn)
+
+    for version in range(1, len(MIGRATIONS) + 1):
+        migrate(conn, version)
+        if schema_version(conn) != version:
+            failures.append(f"upgrade v{version}: user_version is {schema_version(conn)}")
+        check_migration(conn, version, failures)
+        check_plans(conn, version, failures, "upgrade")
+    conn.close()
+
+
+def check_fresh(directory: str, rows: int, failures: list):
+    path = os.path.join(directory, "fresh.db")
+    conn = init_db(path)
+    conn.close()
+    # Rows written without a sort_key get the default from the trigger
+    build_contacts(path, rows, create=False)
+    conn = init_db(path)
+    check_plans(conn, schema_version(conn), failures, "fresh")
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    args = parser.parse_args()
+
+    failures = []
+    with tempfile.TemporaryDirectory() as directory:
+        check_legacy_upgrade(directory, args.rows, failures)
+        check_fresh(directory, args.rows, failures)
+
+    if failures:
+        print(f"\n{len(failures)} check(s) failed:", *failures, sep="\n  ")
+        sys.exit(1)
+    print("\nall query plans ok")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,97 @@
+import asyncio
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import flet as ft
-from database import add_contact_db, get_all_contacts_db, update_contact_db, delete_contact_db
+from database import (
+    MATCH_END,
+    MATCH_START,
+    add_contact_db,
+    get_contacts_page_db,
+    update_contact_db,
+    delete_contact_db,
+)
 
+PAGE_SIZE = 50  # contacts fetched from the database at a time
+LOAD_MORE_EXTENT = 600  # load the next page when this close (px) to the end
+SEARCH_DEBOUNCE = 0.25  # seconds to wait for more typing before searching
 
-def display_contacts(page: ft.Page, contacts_list_view, db_conn, search_text: str = ""):
+
+class ContactListState:
+    """
+    Paging state of the contact list, kept in contacts_list_view.data.
+    cards maps contact id -> ContactCard for the loaded contacts, in list
+    order; after is the keyset cursor of the last one (see
+    get_contacts_page_db).
+    """
+
+    def __init__(self):
+        self.cards = {}
+        self.search_text = ""
+        self.after = None
+        self.has_more = True
+        # Scroll events and searches run on worker threads; one page loads
+        # at a time, and database writes wait for it (the connection is
+        # shared)
+        self.lock = threading.Lock()
+
+    def set_loaded(self, rows, after, limit):
+        """Records the cursor after loading rows with the given limit."""
+        self.has_more = len(rows) == limit
+        self.after = after
+
+
+def _list_state(contacts_list_view) -> ContactListState:
+    """The list's ContactListState, created on first use."""
+    if contacts_list_view.data is None:
+        contacts_list_view.data = ContactListState()
+    return contacts_list_view.data
+
+
+def highlight_spans(marked: str):
+    """Turns text marked by search_contacts_db into spans with matches highlighted."""
+    parts = re.split(f"[{MATCH_START}{MATCH_END}]", marked)
+    return [
+        # Odd parts are the matches
+        ft.TextSpan(
+            part,
+            ft.TextStyle(weight=ft.FontWeight.BOLD, bgcolor=ft.Colors.YELLOW_200)
+            if i % 2
+            else None,
+        )
+        for i, part in enumerate(parts)
+        if part
+    ]
+
+
+class ContactCard(ft.Card):
     """
-    Fetches and displays all contacts in the provided container (ft.Column).
-    Uses ft.Card for each contact and provides Edit/Delete in a PopupMenuButton.
+    Card for one contact, with Edit/Delete in a PopupMenuButton.
+    The contact tuple is kept in card.data, so the menu handlers always see
+    the current values after an in-place update. Search matches, if any,
+    are highlighted.
+    The card is isolated: updating the list does not walk into it, so call
+    card.update() after changing it.
     """
-    contacts_list_view.controls.clear()
-    contacts = get_all_contacts_db(db_conn, search_text)
 
-    for contact in contacts:
-        contact_id, name, phone, email = contact
+    def __init__(self, page: ft.Page, contact, db_conn, contacts_list_view, marked=()):
+        self.name_text = ft.Text(weight=ft.FontWeight.BOLD, size=14)
+        self.phone_text = ft.Text(size=12)
+        self.email_text = ft.Text(size=12)
 
         # Build contact row inside a card
         contact_row = ft.Row(
             [
                 ft.Column(
                     [
-                        ft.Text(name, weight=ft.FontWeight.BOLD, size=14),
+                        self.name_text,
                         ft.Row(
                             [
                                 ft.Icon(ft.Icons.PHONE, size=16),
-                                ft.Text(phone or "-", size=12),
+                                self.phone_text,
                                 ft.Container(width=12),  # small spacer
                                 ft.Icon(ft.Icons.EMAIL, size=16),
-                                ft.Text(email or "-", size=12),
+                                self.email_text,
                             ],
                             tight=True,
                         ),
@@ -39,17 +105,15 @@ def display_contacts(page: ft.Page, contacts_list_view, db_conn, search_text: st
                         ft.PopupMenuItem(
                             text="Edit",
                             icon=ft.Icons.EDIT,
-                            # FIXED: bind current contact with default arg
-                            on_click=lambda e, c=(contact_id, name, phone, email): open_edit_dialog(
-                                page, c, db_conn, contacts_list_view
+                            on_click=lambda e: open_edit_dialog(
+                                page, self.data, db_conn, contacts_list_view
                             ),
                         ),
                         ft.PopupMenuItem(
                             text="Delete",
                             icon=ft.Icons.DELETE,
-                            # FIXED: bind current contact_id
-                            on_click=lambda e, cid=contact_id: confirm_delete(
-                                page, cid, db_conn, contacts_list_view
+                            on_click=lambda e: confirm_delete(
+                                page, self.data[0], db_conn, contacts_list_view
                             ),
                         ),
                     ],
@@ -59,14 +123,180 @@ def display_contacts(page: ft.Page, contacts_list_view, db_conn, search_text: st
             vertical_alignment=ft.CrossAxisAlignment.CENTER,
         )
 
-        card = ft.Card(
+        super().__init__(
             content=ft.Container(content=contact_row, padding=12),
             elevation=2,
             margin=ft.margin.only(bottom=8),
         )
-        contacts_list_view.controls.append(card)
+        self.set_contact(contact, marked)
+
+    def is_isolated(self):
+        return True
+
+    def set_contact(self, contact, marked=()):
+        """
+        Updates the texts to a (possibly edited) contact tuple.
+        marked is the (name, phone, email) with search matches marked, or ().
+        """
+        _, name, phone, email = contact
+        marked_name, marked_phone, marked_email = marked or (None, None, None)
+        set_text(self.name_text, name, marked_name)
+        set_text(self.phone_text, phone, marked_phone)
+        set_text(self.email_text, email, marked_email)
+        self.data = contact
+        self.marked = marked
+
+
+def set_text(text: ft.Text, value, marked=None):
+    """Shows a contact field, with search matches highlighted if marked."""
+    if marked and MATCH_START in marked:
+        text.value = None
+        text.spans = highlight_spans(marked)
+    else:
+        text.value = value or "-"
+        text.spans = None
+
+
+def display_contacts(page: ft.Page, contacts_list_view, db_conn, search_text: str = ""):
+    """
+    Fetches the first page(s) of contacts and reconciles the list with them,
+    keyed by contact id. Existing cards are reused, edited ones are updated
+    in place, and only added or removed cards are sent to the client.
+    For the same search, as many contacts as were loaded are reloaded, so a
+    refresh after an edit keeps the list at its scroll position; a new
+    search starts over from one page. See load_more_contacts.
+    """
+    state = _list_state(contacts_list_view)
+    with state.lock:
+        rows, after, limit = _fetch_first_page(state, db_conn, search_text)
+        _render_contacts(
+            state, page, contacts_list_view, db_conn, search_text, rows, after, limit
+        )
 
-    page.update()
+
+def _fetch_first_page(state, db_conn, search_text):
+    limit = PAGE_SIZE
+    if search_text == state.search_text:
+        limit = max(PAGE_SIZE, len(state.cards))
+    rows, after = get_contacts_page_db(db_conn, search_text, limit=limit)
+    return rows, after, limit
+
+
+def _render_contacts(
+    state, page, contacts_list_view, db_conn, search_text, rows, after, limit
+):
+    state.search_text = search_text
+    state.set_loaded(rows, after, limit)
+    cards = state.cards
+
+    controls = []
+    edited = []
+    for row in rows:
+        # Search results also carry the fields with matches marked
+        contact, marked = row[:4], row[4:]
+        card = cards.get(contact[0])
+        if card is None:
+            card = ContactCard(page, contact, db_conn, contacts_list_view, marked)
+        elif card.data != contact or card.marked != marked:
+            card.set_contact(contact, marked)
+            edited.append(card)
+        controls.append(card)
+
+    for card in edited:
+        card.update()
+
+    # Cards of deleted or filtered-out contacts are dropped
+    contacts_list_view.controls = controls
+    state.cards = {card.data[0]: card for card in controls}
+    contacts_list_view.update()
+
+
+def load_more_contacts(page: ft.Page, contacts_list_view, db_conn):
+    """
+    Appends the next page of contacts, starting after the last loaded one.
+    Does nothing if every contact is loaded or a page is already loading.
+    """
+    state = contacts_list_view.data
+    if state is None or not state.has_more:
+        return
+    if not state.lock.acquire(blocking=False):
+        return
+    try:
+        rows, after = get_contacts_page_db(
+            db_conn, state.search_text, state.after, PAGE_SIZE
+        )
+        state.set_loaded(rows, after, PAGE_SIZE)
+        for row in rows:
+            contact, marked = row[:4], row[4:]
+            card = ContactCard(page, contact, db_conn, contacts_list_view, marked)
+            state.cards[contact[0]] = card
+            contacts_list_view.controls.append(card)
+        if rows:
+            contacts_list_view.update()
+    finally:
+        state.lock.release()
+
+
+class ContactSearch:
+    """
+    Runs the search box's queries off the event loop.
+    Keystrokes less than debounce seconds apart collapse into one query.
+    Queries run one at a time on a dedicated worker thread. Each search gets
+    a generation number, and a search that is superseded (while waiting,
+    queued, or querying) is dropped, so only the last query's results render.
+    """
+
+    def __init__(self, page: ft.Page, contacts_list_view, db_conn, debounce: float = SEARCH_DEBOUNCE):
+        self.page = page
+        self.contacts_list_view = contacts_list_view
+        self.db_conn = db_conn
+        self.debounce = debounce
+        self.generation = 0
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="contact-search"
+        )
+
+    async def search(self, search_text: str, debounce: bool = True):
+        """Shows the contacts matching search_text once typing pauses."""
+        self.generation += 1
+        generation = self.generation
+        if debounce:
+            await asyncio.sleep(self.debounce)
+            if generation != self.generation:
+                return
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._run, generation, search_text)
+
+    def _run(self, generation, search_text):
+        # Queued behind a slower query while a newer one was typed
+        if generation != self.generation:
+            return
+        state = _list_state(self.contacts_list_view)
+        # The first page's size depends on the loaded cards, which a page
+        # load on a scroll thread may change, so fetch under the lock too
+        with state.lock:
+            # Superseded while a page load held the lock
+            if generation != self.generation:
+                return
+            rows, after, limit = _fetch_first_page(state, self.db_conn, search_text)
+            if generation != self.generation:
+                return
+            _render_contacts(
+                state,
+                self.page,
+                self.contacts_list_view,
+                self.db_conn,
+                search_text,
+                rows,
+                after,
+                limit,
+            )
+
+
+def on_contacts_scroll(e: ft.OnScrollEvent, page: ft.Page, contacts_list_view, db_conn):
+    """Loads the next page when the list is scrolled near its end."""
+    if e.max_scroll_extent - e.pixels < LOAD_MORE_EXTENT:
+        load_more_contacts(page, contacts_list_view, db_conn)
 
 
 def add_contact(page: ft.Page, inputs, contacts_list_view, db_conn):
@@ -100,13 +330,14 @@ def add_contact(page: ft.Page, inputs, contacts_list_view, db_conn):
     else:
         email_input.error_text = None
 
-    # Save new contact
-    add_contact_db(
-        db_conn,
-        name_input.value.strip(),
-        phone_input.value.strip(),
-        email_input.value.strip(),
-    )
+    # Save new contact; page loads and searches share the connection
+    with _list_state(contacts_list_view).lock:
+        add_contact_db(
+            db_conn,
+            name_input.value.strip(),
+            phone_input.value.strip(),
+            email_input.value.strip(),
+        )
 
     # Clear fields
     name_input.value = ""
@@ -127,7 +358,8 @@ def open_edit_dialog(page, contact, db_conn, contacts_list_view):
     edit_email = ft.TextField(label="Email", value=email)
 
     def save_and_close(e):
-        update_contact_db(db_conn, contact_id, edit_name.value, edit_phone.value, edit_email.value)
+        with _list_state(contacts_list_view).lock:
+            update_contact_db(db_conn, contact_id, edit_name.value, edit_phone.value, edit_email.value)
         dialog.open = False
         page.update()
         display_contacts(page, contacts_list_view, db_conn)
@@ -152,7 +384,8 @@ def delete_contact(page: ft.Page, contact_id, db_conn, contacts_list_view):
     """
     Opens a confirmation dialog before deletion. Only deletes if user confirms.
     """
-    delete_contact_db(db_conn, contact_id)
+    with _list_state(contacts_list_view).lock:
+        delete_contact_db(db_conn, contact_id)
     display_contacts(page, contacts_list_view, db_conn)
 
 def confirm_delete(page, contact_id, db_conn, contacts_list_view):
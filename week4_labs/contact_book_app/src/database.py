@@ -1,13 +1,57 @@
 import sqlite3
 import os
+import re
+import unicodedata
 
 DB_FILENAME = os.path.join(os.path.dirname(__file__), "contacts.db")
 
+# Wrap matched terms in search results (see search_contacts_db)
+MATCH_START = "\x02"
+MATCH_END = "\x03"
 
-def init_db():
-    """Initializes the database and creates the contacts table if it doesn't exist."""
-    conn = sqlite3.connect(DB_FILENAME, check_same_thread=False)
-    cursor = conn.cursor()
+
+def init_db(path: str = DB_FILENAME):
+    """Opens the database and brings its schema up to date (see migrate)."""
+    conn = sqlite3.connect(path, check_same_thread=False)
+    migrate(conn)
+    init_fts(conn)
+    return conn
+
+
+def sort_key(name):
+    """
+    The key contacts are listed by: the name case-folded, with accents
+    stripped and whitespace collapsed, so "Émile", "emile" and " EMILE"
+    sort together. Stored in contacts.sort_key and indexed.
+    """
+    decomposed = unicodedata.normalize("NFKD", name or "")
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(stripped.casefold().split())
+
+
+# Keeps the full-text index in sync when a contact's text changes. Writes
+# that only touch sort_key leave the index alone.
+FTS_UPDATE_TRIGGER = """
+    CREATE TRIGGER IF NOT EXISTS contacts_fts_update
+    AFTER UPDATE OF name, phone, email ON contacts BEGIN
+        INSERT INTO contacts_fts (contacts_fts, rowid, name, phone, email)
+        VALUES ('delete', old.id, old.name, old.phone, old.email);
+        INSERT INTO contacts_fts (rowid, name, phone, email)
+        VALUES (new.id, new.name, new.phone, new.email);
+    END
+"""
+
+
+# ---------------------------------------------------------
+# SCHEMA MIGRATIONS
+# ---------------------------------------------------------
+# PRAGMA user_version is the number of migrations applied. Append new
+# migrations to MIGRATIONS; never change or reorder one that has shipped.
+# benchmarks/check_query_plans.py checks the query plans after each one.
+
+
+def _create_contacts(cursor):
+    # Databases from before versioning already have the table
     cursor.execute(
         """
         CREATE TABLE IF NOT EXISTS contacts (
@@ -18,16 +62,148 @@ def init_db():
         )
         """
     )
+
+
+def _add_sort_key(cursor):
+    cursor.execute("ALTER TABLE contacts ADD COLUMN sort_key TEXT")
+    # Older full-text triggers fire on any update; narrow them first so the
+    # backfill does not reindex every contact
+    if has_fts(cursor.connection):
+        cursor.execute("DROP TRIGGER IF EXISTS contacts_fts_update")
+        cursor.execute(FTS_UPDATE_TRIGGER)
+    cursor.execute("SELECT id, name FROM contacts")
+    cursor.executemany(
+        "UPDATE contacts SET sort_key = ? WHERE id = ?",
+        [(sort_key(name), contact_id) for contact_id, name in cursor.fetchall()],
+    )
+    # Writers that don't set the column (e.g. an older build of the app)
+    # still get a usable, if ASCII-only, key
+    cursor.execute(
+        """
+        CREATE TRIGGER contacts_sort_key_default
+        AFTER INSERT ON contacts WHEN new.sort_key IS NULL BEGIN
+            UPDATE contacts SET sort_key = lower(new.name) WHERE id = new.id;
+        END
+        """
+    )
+
+
+def _add_covering_indexes(cursor):
+    # Superseded by the sort key index
+    cursor.execute("DROP INDEX IF EXISTS idx_contacts_name")
+    # Serves the list order, keyset pages and the LIKE search fallback
+    # (see contacts_page_sql) from the index alone, without table lookups
+    cursor.execute(
+        "CREATE INDEX idx_contacts_sort ON contacts (sort_key, id, name, phone, email)"
+    )
+
+
+MIGRATIONS = [
+    _create_contacts,  # 1
+    _add_sort_key,  # 2
+    _add_covering_indexes,  # 3
+]
+
+
+def schema_version(conn):
+    """Returns the number of migrations applied to the database."""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn, target: int = None):
+    """
+    Applies the migrations the database has not had yet, in order, up to
+    version target (default: all of them). Each migration runs in its own
+    transaction together with the user_version bump, so one that fails
+    leaves the database at the previous version.
+    Returns the schema version.
+    """
+    if target is None:
+        target = len(MIGRATIONS)
+    version = schema_version(conn)
+    while version < target:
+        cursor = conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            MIGRATIONS[version](cursor)
+            cursor.execute(f"PRAGMA user_version = {version + 1}")
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+        version += 1
+    return version
+
+
+def init_fts(conn):
+    """
+    Creates the full-text index over name, phone and email if SQLite has FTS5.
+    It is an external-content table: it stores only the index, and triggers
+    keep it in sync with the contacts table. A database created before the
+    index existed is backfilled once. Without FTS5, search falls back to LIKE.
+    """
+    if has_fts(conn):
+        return
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            """
+            CREATE VIRTUAL TABLE contacts_fts USING fts5(
+                name, phone, email,
+                content='contacts', content_rowid='id', prefix='2 3'
+            )
+            """
+        )
+    except sqlite3.OperationalError:
+        # SQLite built without FTS5
+        return
+    # Matches in the name count ten times as much as in phone or email
+    cursor.execute(
+        "INSERT INTO contacts_fts (contacts_fts, rank) VALUES ('rank', 'bm25(10.0, 1.0, 1.0)')"
+    )
+    cursor.executescript(
+        """
+        CREATE TRIGGER IF NOT EXISTS contacts_fts_insert AFTER INSERT ON contacts BEGIN
+            INSERT INTO contacts_fts (rowid, name, phone, email)
+            VALUES (new.id, new.name, new.phone, new.email);
+        END;
+        CREATE TRIGGER IF NOT EXISTS contacts_fts_delete AFTER DELETE ON contacts BEGIN
+            INSERT INTO contacts_fts (contacts_fts, rowid, name, phone, email)
+            VALUES ('delete', old.id, old.name, old.phone, old.email);
+        END;
+        """
+        + FTS_UPDATE_TRIGGER
+        + ";"
+    )
+    # Backfill contacts that were added before the index existed
+    cursor.execute("INSERT INTO contacts_fts (contacts_fts) VALUES ('rebuild')")
     conn.commit()
-    return conn
+
+
+def has_fts(conn):
+    """Returns True if the database has the full-text index."""
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'contacts_fts'"
+    )
+    return cursor.fetchone() is not None
+
+
+def fts_query(search_term: str):
+    """
+    Turns typed text into an FTS5 query in which every word must match the
+    start of a word, e.g. "ann 555" -> '"ann"* "555"*'.
+    Returns "" if the text has no words.
+    """
+    return " ".join(f'"{word}"*' for word in re.findall(r"\w+", search_term))
 
 
 def add_contact_db(conn, name, phone, email):
     """Adds a new contact to the database."""
     cursor = conn.cursor()
     cursor.execute(
-        "INSERT INTO contacts (name, phone, email) VALUES (?, ?, ?)",
-        (name, phone, email),
+        "INSERT INTO contacts (name, phone, email, sort_key) VALUES (?, ?, ?, ?)",
+        (name, phone, email, sort_key(name)),
     )
     conn.commit()
 
@@ -41,20 +217,100 @@ def get_all_contacts_db(conn, search_term: str = None):
     if search_term:
         like_term = f"%{search_term}%"
         cursor.execute(
-            "SELECT id, name, phone, email FROM contacts WHERE name LIKE ? ORDER BY name COLLATE NOCASE",
+            "SELECT id, name, phone, email FROM contacts WHERE name LIKE ? ORDER BY sort_key, id",
             (like_term,),
         )
     else:
-        cursor.execute("SELECT id, name, phone, email FROM contacts ORDER BY name COLLATE NOCASE")
+        cursor.execute("SELECT id, name, phone, email FROM contacts ORDER BY sort_key, id")
     return cursor.fetchall()
 
 
+def get_contacts_page_db(conn, search_term: str = None, after=None, limit: int = 50):
+    """
+    Retrieves one page of contacts and the cursor for the next page.
+    Contacts are ordered by sort key (see sort_key) then id. after is the
+    cursor returned with the previous page; the page starts right after its
+    last contact. This keyset pagination walks the sort key index, so a deep
+    page costs the same as the first (unlike OFFSET).
+    If search_term is provided and the full-text index exists, returns the
+    best matches first (see search_contacts_db); otherwise performs a
+    case-insensitive search on the name field.
+    Returns (rows, cursor); rows are (id, name, phone, email) tuples.
+    """
+    if search_term and fts_query(search_term) and has_fts(conn):
+        return search_contacts_db(conn, search_term, after, limit)
+
+    cursor = conn.cursor()
+    cursor.execute(*contacts_page_sql(search_term, after, limit))
+    rows = cursor.fetchall()
+    if not rows:
+        return rows, after
+    return [row[:4] for row in rows], (rows[-1][4], rows[-1][0])
+
+
+def contacts_page_sql(search_term: str = None, after=None, limit: int = 50):
+    """Returns the (sql, params) of a get_contacts_page_db query without full-text search."""
+    conditions = []
+    params = []
+    if search_term:
+        conditions.append("name LIKE ?")
+        params.append(f"%{search_term}%")
+    if after is not None:
+        conditions.append("(sort_key, id) > (?, ?)")
+        params.extend(after)
+    where = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+    sql = (
+        "SELECT id, name, phone, email, sort_key FROM contacts "
+        + where
+        + "ORDER BY sort_key, id LIMIT ?"
+    )
+    return sql, (*params, limit)
+
+
+def search_contacts_db(conn, search_term: str, after=None, limit: int = 50):
+    """
+    Full-text search over name, phone and email, best matches first.
+    Every word of search_term must match the start of a word in some field,
+    so "ann 555" finds "Anna Smith, 555-0100". Results are ranked by BM25,
+    with name matches weighted highest.
+    Returns (rows, cursor) like get_contacts_page_db, but each row also has
+    the name, phone and email with matches wrapped in MATCH_START/MATCH_END.
+    """
+    cursor = conn.cursor()
+    cursor.execute(*search_contacts_sql(search_term, after, limit))
+    rows = cursor.fetchall()
+    if not rows:
+        return rows, after
+    return [row[:7] for row in rows], (rows[-1][7], rows[-1][0])
+
+
+def search_contacts_sql(search_term: str, after=None, limit: int = 50):
+    """Returns the (sql, params) of a search_contacts_db query."""
+    conditions = ["contacts_fts MATCH ?"]
+    params = [fts_query(search_term)]
+    if after is not None:
+        conditions.append("(f.rank, f.rowid) > (?, ?)")
+        params.extend(after)
+    sql = f"""
+        SELECT c.id, c.name, c.phone, c.email,
+               highlight(contacts_fts, 0, '{MATCH_START}', '{MATCH_END}'),
+               highlight(contacts_fts, 1, '{MATCH_START}', '{MATCH_END}'),
+               highlight(contacts_fts, 2, '{MATCH_START}', '{MATCH_END}'),
+               f.rank
+        FROM contacts_fts f JOIN contacts c ON c.id = f.rowid
+        WHERE {' AND '.join(conditions)}
+        ORDER BY f.rank, f.rowid
+        LIMIT ?
+        """
+    return sql, (*params, limit)
+
+
 def update_contact_db(conn, contact_id, name, phone, email):
     """Updates an existing contact in the database."""
     cursor = conn.cursor()
     cursor.execute(
-        "UPDATE contacts SET name = ?, phone = ?, email = ? WHERE id = ?",
-        (name, phone, email, contact_id),
+        "UPDATE contacts SET name = ?, phone = ?, email = ?, sort_key = ? WHERE id = ?",
+        (name, phone, email, sort_key(name), contact_id),
     )
     conn.commit()
 
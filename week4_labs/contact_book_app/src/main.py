@@ -1,6 +1,6 @@
 import flet as ft
 from database import init_db
-from app_logic import display_contacts, add_contact
+from app_logic import ContactSearch, display_contacts, add_contact, on_contacts_scroll
 
 def main(page: ft.Page):
     page.title = "Contact Book"
@@ -34,20 +34,27 @@ def main(page: ft.Page):
     inputs = (name_input, phone_input, email_input)
 
     # Search field
-    search_input = ft.TextField(label="Search by name", hint_text="Type to filter contacts", width=360)
+    search_input = ft.TextField(label="Search contacts", hint_text="Type to filter contacts", width=360)
 
-    # Contacts list
-    contacts_list_view = ft.ListView(expand=1, spacing=10, auto_scroll=True )
+    # Contacts list, loaded a page at a time as it is scrolled
+    contacts_list_view = ft.ListView(expand=1, spacing=10, on_scroll_interval=100)
+    contacts_list_view.on_scroll = lambda e: on_contacts_scroll(e, page, contacts_list_view, db_conn)
 
     # Add button
     add_button = ft.ElevatedButton("Add Contact", on_click=lambda e: add_contact(page, inputs, contacts_list_view, db_conn))
 
+    # Searches run on a worker thread; only the latest one renders
+    contact_search = ContactSearch(page, contacts_list_view, db_conn)
+
     # Clear search button (optional)
-    clear_search_btn = ft.IconButton(ft.Icons.CLEAR, tooltip="Clear search", on_click=lambda e: clear_search(page, search_input, contacts_list_view, db_conn))
+    async def on_clear_search(e):
+        await clear_search(page, search_input, contact_search)
+
+    clear_search_btn = ft.IconButton(ft.Icons.CLEAR, tooltip="Clear search", on_click=on_clear_search)
 
-    # Search on change: refresh displayed list
-    def on_search_change(e):
-        display_contacts(page, contacts_list_view, db_conn, search_input.value)
+    # Search on change: refresh displayed list once typing pauses
+    async def on_search_change(e):
+        await contact_search.search(search_input.value)
 
     search_input.on_change = on_search_change
 
@@ -70,6 +77,7 @@ def main(page: ft.Page):
             ),
         ],
         spacing=8,
+        expand=True,
     )
 
     page.add(top_row, ft.Divider(), form)
@@ -77,10 +85,11 @@ def main(page: ft.Page):
     # Initial display
     display_contacts(page, contacts_list_view, db_conn)
 
-def clear_search(page: ft.Page, search_input: ft.TextField, contacts_container: ft.Column, db_conn):
+async def clear_search(page: ft.Page, search_input: ft.TextField, contact_search: ContactSearch):
     search_input.value = ""
     page.update()
-    display_contacts(page, contacts_container, db_conn)
+    # Also drops any search still pending from typing
+    await contact_search.search("", debounce=False)
 
 if __name__ == "__main__":
     ft.app(target=main)
\ No newline at end of file